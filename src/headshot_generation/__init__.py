@@ -1,5 +1,5 @@
 """Package for headshot generation components."""
 
-from .gemini_client import DEFAULT_MODEL, DEFAULT_PROMPT, generate_headshot
+from .gemini_client import DEFAULT_MODEL, DEFAULT_PROMPT, agenerate_headshot, generate_headshot
 
-__all__ = ["generate_headshot", "DEFAULT_PROMPT", "DEFAULT_MODEL"]
+__all__ = ["generate_headshot", "agenerate_headshot", "DEFAULT_PROMPT", "DEFAULT_MODEL"]
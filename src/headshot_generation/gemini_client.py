@@ -2,22 +2,24 @@
 
 from __future__ import annotations
 
+import asyncio
+import functools
+import hashlib
 import io
 import os
-import hashlib
 import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Iterable, List, Sequence
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Sequence, Tuple
 
 from PIL import Image
 
-try:
+from podthumb_common import import_genai, iter_image_bytes, load_env_key, reset_env_cache, write_image
+
+if TYPE_CHECKING:  # imported lazily at runtime, see import_genai
     from google import genai
     from google.genai import types
-except ImportError as exc:  # pragma: no cover - handled at runtime
-    raise ImportError(
-        "google-genai is required for headshot generation. Install with `pip install google-genai`."
-    ) from exc
 
 
 DEFAULT_MODEL = os.environ.get("PODTHUMB_HEADSHOT_MODEL", "gemini-3-pro-image-preview")
@@ -34,32 +36,41 @@ RETRY_DELAY_S = 2
 MAX_REFERENCE_IMAGES = 14
 
 
-def _load_env_key() -> None:
-    """Best-effort load GEMINI_API_KEY/GOOGLE_API_KEY from .env files.
+def _reset_env_cache() -> None:
+    """Forget that .env files were loaded so the next call re-reads them (tests)."""
 
-    Checks (in order): existing environment, local project .env, cwd .env,
-    the sibling "win" repo .env if present, and HOME/.env. Values already in
-    the environment are never overwritten.
-    """
+    reset_env_cache()
+    _config.cache_clear()
 
-    candidates = [
-        Path("/Users/adi/GitHub/win/.env"),
-        Path(__file__).resolve().parents[2] / ".env",  # this repo root
-        Path.cwd() / ".env",
-        Path.home() / ".env",
-    ]
 
-    for path in candidates:
-        if not path.exists():
-            continue
-        for line in path.read_text().splitlines():
-            line = line.strip()
-            if not line or line.startswith("#") or "=" not in line:
-                continue
-            key, value = line.split("=", 1)
-            if key in os.environ:
-                continue
-            os.environ[key] = value
+@dataclass(frozen=True)
+class _EnvConfig:
+    """Snapshot of the env-driven settings used on each headshot call."""
+
+    api_key: str | None
+    model: str
+
+
+@functools.lru_cache(maxsize=1)
+def _config() -> _EnvConfig:
+    """Load .env files once and snapshot the API key and model override."""
+
+    load_env_key()
+    return _EnvConfig(
+        api_key=os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY"),
+        model=os.environ.get("PODTHUMB_HEADSHOT_MODEL", DEFAULT_MODEL),
+    )
+
+
+@functools.lru_cache(maxsize=4)
+def _client_for(api_key: str) -> "genai.Client":
+    """Return a shared client per API key so HTTP sessions stay warm across calls.
+
+    Use ``_client_for.cache_clear()`` to drop cached clients (tests).
+    """
+
+    genai, _ = import_genai("headshot generation")
+    return genai.Client(api_key=api_key)
 
 
 def _cache_key(
@@ -89,8 +100,12 @@ def _cache_key(
     return hasher.hexdigest()
 
 
-def _square_center_crop(image: Image.Image, *, min_side: int = 512) -> Image.Image:
-    """Center-crop to a square and upscale to the requested minimum side."""
+def _square_center_crop(image: Image.Image, *, min_side: int = 512, max_side: int = 1024) -> Image.Image:
+    """Center-crop to a square and scale its side into ``[min_side, max_side]``.
+
+    Downscaling happens in place via ``thumbnail`` (box-reduce, then LANCZOS),
+    so callers should not hold on to the pre-crop size.
+    """
 
     width, height = image.size
     side = min(width, height)
@@ -98,55 +113,193 @@ def _square_center_crop(image: Image.Image, *, min_side: int = 512) -> Image.Ima
     top = (height - side) // 2
     cropped = image.crop((left, top, left + side, top + side))
     if side < min_side:
-        cropped = cropped.resize((min_side, min_side), Image.Resampling.LANCZOS)
+        # OpenCV's SIMD LANCZOS4 is much faster than Pillow's for this upscale; imported
+        # here so callers that never upscale (e.g. composer cache hits) skip loading it.
+        try:
+            import cv2
+            import numpy as np
+        except ImportError:  # pragma: no cover - optional speedup
+            cropped = cropped.resize((min_side, min_side), Image.Resampling.LANCZOS)
+        else:
+            resized = cv2.resize(np.asarray(cropped), (min_side, min_side), interpolation=cv2.INTER_LANCZOS4)
+            cropped = Image.fromarray(resized)
+    elif side > max_side:
+        cropped.thumbnail((max_side, max_side), Image.Resampling.LANCZOS, reducing_gap=2.0)
     return cropped
 
 
-def _prepare_reference(path: Path, *, crop_square: bool = True) -> Image.Image:
+def _prepare_reference(
+    path: Path, *, crop_square: bool = True, min_side: int = 512, max_side: int = 1024
+) -> types.Part:
+    """Load a reference as an upload-ready image part, cropping/scaling only when needed.
+
+    ``Image.open`` only parses the header, so RGB/RGBA JPEG/PNG refs that need
+    no change (any size without ``crop_square``; square and within
+    ``[min_side, max_side]`` with it) are passed through as their original
+    bytes. Anything else is decoded, prepped, and re-encoded: PNG for PNG
+    sources or alpha (lossless, as the SDK's own PIL path does), JPEG
+    otherwise, so no decoded pixel buffers stay alive during the upload.
+    """
+
+    _, types = import_genai("headshot generation")
     image = Image.open(path)
+    width, height = image.size
+    source_format = image.format
+    needs_crop = crop_square and not (width == height and min_side <= width <= max_side)
+    if not needs_crop and image.mode in ("RGB", "RGBA") and source_format in ("JPEG", "PNG"):
+        mime_type = Image.MIME[source_format]
+        image.close()
+        return types.Part.from_bytes(data=path.read_bytes(), mime_type=mime_type)
+
+    if source_format == "JPEG" and crop_square:
+        # Let libjpeg decode at 1/2..1/8 scale; keep headroom above min_side for LANCZOS.
+        target = max(min_side, 1024)
+        image.draft("RGB", (target, target))
+    image.load()
     if image.mode not in ("RGB", "RGBA"):
         image = image.convert("RGB")
     if crop_square:
-        image = _square_center_crop(image)
-    return image
-
-
-def _extract_images(response) -> List[Image.Image]:
-    """Collect inline image parts from a generate_content response."""
-
-    images: List[Image.Image] = []
-
-    for part in getattr(response, "parts", []) or []:
-        inline = getattr(part, "inline_data", None)
-        if inline and hasattr(inline, "data") and inline.data:
-            # Prefer direct BytesIO loading for reliability
-            try:
-                images.append(Image.open(io.BytesIO(inline.data)))
-            except Exception:
-                # Fallback to as_image if BytesIO fails
-                if hasattr(part, "as_image"):
-                    try:
-                        images.append(part.as_image())
-                    except Exception:
-                        pass
-
-    if not images and hasattr(response, "generated_images"):
-        for img in response.generated_images:
-            if hasattr(img, "as_image"):
-                images.append(img.as_image())
-            elif hasattr(img, "image_bytes"):
-                images.append(Image.open(io.BytesIO(img.image_bytes)))
-
-    if not images and hasattr(response, "candidates"):
-        for candidate in response.candidates:
-            for part in getattr(candidate.content, "parts", []) or []:
-                if getattr(part, "inline_data", None):
-                    if hasattr(part, "as_image"):
-                        images.append(part.as_image())
-                    else:
-                        images.append(Image.open(io.BytesIO(part.inline_data.data)))
-
-    return images
+        image = _square_center_crop(image, min_side=min_side, max_side=max_side)
+
+    buf = io.BytesIO()
+    if image.mode == "RGBA" or source_format != "JPEG":
+        image.save(buf, format="PNG")
+        mime_type = "image/png"
+    else:
+        image.save(buf, format="JPEG", quality=90)
+        mime_type = "image/jpeg"
+    image.close()
+    return types.Part.from_bytes(data=buf.getvalue(), mime_type=mime_type)
+
+
+def _output_name(base_name: str, idx: int, num_images: int) -> str:
+    if num_images > 1:
+        stem, suffix = base_name.rsplit(".", 1)
+        return f"{stem}_{idx}.{suffix}"
+    return base_name
+
+
+def _plan_outputs(
+    output_dir: Path | str | None, output_name: str | None, num_images: int
+) -> Tuple[Path, str, List[Path]]:
+    """Create the output dir and return ``(out_dir, base_name, expected_paths)``."""
+
+    out_dir = Path(output_dir) if output_dir else Path("artifacts/headshots")
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    # Always use headshot.png as the output filename
+    base_name = Path(output_name).name if output_name else "headshot.png"
+    if not base_name.endswith((".png", ".jpg", ".jpeg")):
+        base_name = "headshot.png"
+
+    candidate_paths = [out_dir / _output_name(base_name, i, num_images) for i in range(1, max(1, num_images) + 1)]
+    return out_dir, base_name, candidate_paths
+
+
+def _outputs_exist(out_dir: Path, paths: Sequence[Path]) -> bool:
+    """Check all outputs with one directory scan instead of a stat per file."""
+
+    with os.scandir(out_dir) as entries:
+        existing = {entry.name for entry in entries}
+    return all(p.name in existing for p in paths)
+
+
+def _prepare_references(refs: Sequence[Path], *, crop_square: bool) -> List[types.Part]:
+    # Pillow releases the GIL while decoding/resizing, so prep refs concurrently.
+    with ThreadPoolExecutor(max_workers=min(len(refs), os.cpu_count() or 4)) as ex:
+        return list(ex.map(lambda p: _prepare_reference(Path(p), crop_square=crop_square), refs))
+
+
+def _images_from_response(response) -> Tuple[List[Tuple[bytes, str | None]], Exception | None]:
+    """Return ``(images, error)`` for one attempt; raises if the request was blocked."""
+
+    # Detect blocking early
+    if getattr(response, "prompt_feedback", None) and getattr(response.prompt_feedback, "block_reason", None):
+        reason = response.prompt_feedback.block_reason
+        raise RuntimeError(f"Headshot request was blocked by the model: {reason}")
+
+    images = list(iter_image_bytes(response))
+    if images:
+        return images, None
+
+    # No images returned - prepare error info for potential retry
+    feedback = getattr(response, "prompt_feedback", None)
+    reason = getattr(feedback, "block_reason", None) if feedback else None
+    cand_count = len(getattr(response, "candidates", []) or [])
+    parts_count = sum(len(getattr(c.content, "parts", []) or []) for c in (getattr(response, "candidates", []) or []))
+    return [], RuntimeError(
+        f"Headshot model returned no images. block_reason={reason} resp_id={getattr(response, 'response_id', None)} "
+        f"candidates={cand_count} parts={parts_count}"
+    )
+
+
+def _save_images(
+    images: List[Tuple[bytes, str | None]], out_dir: Path, base_name: str, num_images: int
+) -> List[Path]:
+    paths: List[Path] = []
+    for idx, (data, mime_type) in enumerate(images, start=1):
+        out_path = out_dir / _output_name(base_name, idx, num_images)
+        write_image(data, mime_type, out_path)
+        paths.append(out_path)
+    return paths
+
+
+@functools.lru_cache(maxsize=32)
+def _generation_config(aspect_ratio: str) -> types.GenerateContentConfig:
+    """Build (once per aspect ratio) the image-generation config; treat as read-only."""
+
+    _, types = import_genai("headshot generation")
+    return types.GenerateContentConfig(
+        response_modalities=["IMAGE"],
+        image_config=types.ImageConfig(
+            aspect_ratio=aspect_ratio,
+        ),
+    )
+
+
+@dataclass(frozen=True)
+class _HeadshotJob:
+    """Resolved inputs shared by the sync and async entry points."""
+
+    refs: List[Path]
+    api_key: str
+    model: str
+    out_dir: Path
+    base_name: str
+    paths: List[Path]
+
+
+def _plan_job(
+    reference_paths: Sequence[Path] | Iterable[Path],
+    *,
+    api_key: str | None,
+    model: str | None,
+    output_dir: Path | str | None,
+    output_name: str | None,
+    num_images: int,
+) -> _HeadshotJob:
+    refs = list(reference_paths)
+    if not refs:
+        raise ValueError("At least one reference frame is required for headshot generation.")
+
+    if len(refs) > MAX_REFERENCE_IMAGES:
+        refs = refs[:MAX_REFERENCE_IMAGES]
+
+    env = _config()
+    api_key = api_key or env.api_key
+    if not api_key:
+        raise RuntimeError("Set GEMINI_API_KEY (or GOOGLE_API_KEY) before generating headshots.")
+
+    out_dir, base_name, candidate_paths = _plan_outputs(output_dir, output_name, num_images)
+    return _HeadshotJob(refs, api_key, model or env.model, out_dir, base_name, candidate_paths)
+
+
+def _retry_delays() -> Iterator[float]:
+    """Yield the wait before each attempt: none before the first, then linear backoff."""
+
+    yield 0.0
+    for attempt in range(1, MAX_RETRIES):
+        yield RETRY_DELAY_S * attempt
 
 
 def generate_headshot(
@@ -182,91 +335,94 @@ def generate_headshot(
         A list of saved headshot paths (one per generated image).
     """
 
-    refs = list(reference_paths)
-    if not refs:
-        raise ValueError("At least one reference frame is required for headshot generation.")
+    job = _plan_job(
+        reference_paths,
+        api_key=api_key,
+        model=model,
+        output_dir=output_dir,
+        output_name=output_name,
+        num_images=num_images,
+    )
+    if use_cache and _outputs_exist(job.out_dir, job.paths):
+        return job.paths
 
-    if len(refs) > MAX_REFERENCE_IMAGES:
-        refs = refs[:MAX_REFERENCE_IMAGES]
+    prepared_parts = _prepare_references(job.refs, crop_square=crop_square)
 
-    _load_env_key()
+    client = _client_for(job.api_key)
+    config = _generation_config(aspect_ratio)
 
-    api_key = api_key or os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY")
-    if not api_key:
-        raise RuntimeError("Set GEMINI_API_KEY (or GOOGLE_API_KEY) before generating headshots.")
+    # Retry loop for transient API failures
+    last_error: Exception | None = None
+    for delay in _retry_delays():
+        if delay:
+            time.sleep(delay)
+        response = client.models.generate_content(
+            model=job.model,
+            contents=[prompt or DEFAULT_PROMPT, *prepared_parts],
+            config=config,
+        )
+        images, last_error = _images_from_response(response)
+        if images:
+            return _save_images(images, job.out_dir, job.base_name, num_images)
 
-    out_dir = Path(output_dir) if output_dir else Path("artifacts/headshots")
-    out_dir.mkdir(parents=True, exist_ok=True)
+    raise last_error or RuntimeError("Headshot generation failed after retries")
 
-    # Always use headshot.png as the output filename
-    base_name = Path(output_name).name if output_name else "headshot.png"
-    if not base_name.endswith((".png", ".jpg", ".jpeg")):
-        base_name = "headshot.png"
 
-    def _fname(idx: int) -> str:
-        if num_images > 1:
-            stem, suffix = base_name.rsplit(".", 1)
-            return f"{stem}_{idx}.{suffix}"
-        return base_name
+async def agenerate_headshot(
+    reference_paths: Sequence[Path] | Iterable[Path],
+    *,
+    prompt: str | None = None,
+    output_dir: Path | str | None = None,
+    output_name: str | None = None,
+    model: str | None = None,
+    aspect_ratio: str = "1:1",
+    image_size: str = "1K",
+    num_images: int = 1,
+    api_key: str | None = None,
+    crop_square: bool = True,
+    use_cache: bool = True,
+) -> List[Path]:
+    """Async variant of :func:`generate_headshot` using the ``client.aio`` API.
 
-    candidate_paths = [out_dir / _fname(i) for i in range(1, max(1, num_images) + 1)]
+    Retry backoff uses ``asyncio.sleep`` and reference prep runs in a worker
+    thread, so many subjects can be awaited together (e.g. ``asyncio.gather``)
+    and their request and backoff windows overlap. Arguments match
+    :func:`generate_headshot`.
+    """
 
-    if use_cache and all(p.exists() for p in candidate_paths):
-        return candidate_paths
+    job = _plan_job(
+        reference_paths,
+        api_key=api_key,
+        model=model,
+        output_dir=output_dir,
+        output_name=output_name,
+        num_images=num_images,
+    )
+    if use_cache and _outputs_exist(job.out_dir, job.paths):
+        return job.paths
 
-    prepared_images = [_prepare_reference(Path(path), crop_square=crop_square) for path in refs]
+    prepared_parts = await asyncio.to_thread(_prepare_references, job.refs, crop_square=crop_square)
 
-    client = genai.Client(api_key=api_key)
-    config = types.GenerateContentConfig(
-        response_modalities=["IMAGE"],
-        image_config=types.ImageConfig(
-            aspect_ratio=aspect_ratio,
-        ),
-    )
+    # Not _client_for: the aio HTTP pool is bound to the running event loop, so a
+    # client shared across asyncio.run() calls would reuse connections from a closed loop.
+    genai, _ = import_genai("headshot generation")
+    client = genai.Client(api_key=job.api_key)
+    config = _generation_config(aspect_ratio)
 
-    # Retry loop for transient API failures
-    images: List[Image.Image] = []
     last_error: Exception | None = None
-    for attempt in range(1, MAX_RETRIES + 1):
-        response = client.models.generate_content(
-            model=model or DEFAULT_MODEL,
-            contents=[prompt or DEFAULT_PROMPT, *prepared_images],
+    for delay in _retry_delays():
+        if delay:
+            await asyncio.sleep(delay)
+        response = await client.aio.models.generate_content(
+            model=job.model,
+            contents=[prompt or DEFAULT_PROMPT, *prepared_parts],
             config=config,
         )
-
-        # Detect blocking early
-        if getattr(response, "prompt_feedback", None) and getattr(response.prompt_feedback, "block_reason", None):
-            reason = response.prompt_feedback.block_reason
-            raise RuntimeError(f"Headshot request was blocked by the model: {reason}")
-
-        images = _extract_images(response)
+        images, last_error = _images_from_response(response)
         if images:
-            break  # Success
-
-        # No images returned - prepare error info for potential retry
-        feedback = getattr(response, "prompt_feedback", None)
-        reason = getattr(feedback, "block_reason", None) if feedback else None
-        cand_count = len(getattr(response, "candidates", []) or [])
-        parts_count = sum(len(getattr(c.content, "parts", []) or []) for c in (getattr(response, "candidates", []) or []))
-        last_error = RuntimeError(
-            f"Headshot model returned no images. block_reason={reason} resp_id={getattr(response, 'response_id', None)} "
-            f"candidates={cand_count} parts={parts_count}"
-        )
-
-        if attempt < MAX_RETRIES:
-            time.sleep(RETRY_DELAY_S * attempt)  # Exponential backoff
-
-    if not images:
-        raise last_error or RuntimeError("Headshot generation failed after retries")
+            return await asyncio.to_thread(_save_images, images, job.out_dir, job.base_name, num_images)
 
-    paths: List[Path] = []
-    for idx, image in enumerate(images, start=1):
-        filename = _fname(idx)
-        out_path = out_dir / filename
-        image.save(out_path)
-        paths.append(out_path)
-
-    return paths
+    raise last_error or RuntimeError("Headshot generation failed after retries")
 
 
-__all__ = ["generate_headshot", "DEFAULT_PROMPT", "DEFAULT_MODEL"]
+__all__ = ["generate_headshot", "agenerate_headshot", "DEFAULT_PROMPT", "DEFAULT_MODEL"]
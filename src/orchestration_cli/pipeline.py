@@ -2,38 +2,81 @@
 
 from __future__ import annotations
 
+import argparse
+import functools
+import hashlib
+import itertools
 import json
+import logging
+import os
+import shutil
 import time
-import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, Iterable, List
+from typing import Any, Dict, Iterable, List, Mapping, Sequence
+
+# Stage modules (google-genai, Pillow) are imported inside the functions that
+# use them so importing this module stays cheap.
+
+log = logging.getLogger(__name__)
 
-from speaker_identification.frame_sampler import sample_frames as ffmpeg_sample_frames
-from speaker_identification.gemini_identify import identify_speakers
-from speaker_identification.cropper import crop_frame
-from headshot_generation import generate_headshot
-from thumbnail_composition import compose_thumbnail as compose_with_gemini
-import shutil
+
+def _ensure_logging() -> None:
+    """Show progress on the console unless the caller already configured logging."""
+
+    if not logging.getLogger().hasHandlers():
+        logging.basicConfig(level=logging.INFO, format="%(message)s")
 
 
 def sample_frames(video_path: Path, timestamps: Iterable[float]) -> List[Path]:
     """Extract frames at given timestamps using ffmpeg."""
 
+    from speaker_identification.frame_sampler import sample_frames as ffmpeg_sample_frames
+
     return ffmpeg_sample_frames(video_path, timestamps, out_dir=Path("artifacts/frames"))
 
 
 def _get_duration_seconds(video_path: Path) -> float | None:
+    """Video duration via ffprobe, memoized per (path, mtime, size)."""
+
     try:
+        st = video_path.stat()
+    except OSError:
+        return _probe_duration(str(video_path))
+    return _probe_duration_cached(str(video_path), st.st_mtime_ns, st.st_size)
+
+
+@functools.lru_cache(maxsize=128)
+def _probe_duration_cached(video_path: str, mtime_ns: int, size: int) -> float | None:
+    return _probe_duration(video_path)
+
+
+@functools.lru_cache(maxsize=1)
+def _ffprobe_bin() -> str:
+    """Resolve ffprobe on PATH once per process."""
+
+    path = shutil.which("ffprobe")
+    if path is None:
+        raise RuntimeError("ffprobe not found on PATH; install ffmpeg to probe video durations.")
+    return path
+
+
+def _probe_duration(video_path: str) -> float | None:
+    import subprocess
+
+    try:
+        # A missing ffprobe just means "unknown duration" here; the Gemini cache-miss
+        # path in extract_frames_with_gemini checks for it up front instead.
         result = subprocess.run(
             [
-                "ffprobe",
+                _ffprobe_bin(),
                 "-v",
                 "error",
                 "-show_entries",
                 "format=duration",
                 "-of",
                 "default=noprint_wrappers=1:nokey=1",
-                str(video_path),
+                video_path,
             ],
             check=True,
             capture_output=True,
@@ -44,6 +87,81 @@ def _get_duration_seconds(video_path: Path) -> float | None:
         return None
 
 
+MANIFEST_CACHE_DIR = Path("~/.cache/podthumb/manifests").expanduser()
+
+
+def _read_fresh_json(path: Path, ttl_seconds: float) -> Dict[str, Any] | None:
+    """Load JSON from ``path`` if it exists and is younger than ``ttl_seconds``."""
+
+    try:
+        if time.time() - path.stat().st_mtime > ttl_seconds:
+            return None
+        return json.loads(path.read_text())
+    except Exception:
+        return None  # missing or unreadable -> recompute
+
+
+def _write_json_atomic(path: Path, data: Any) -> None:
+    """Write JSON to a sibling temp file and rename it into place.
+
+    A crash mid-write can then never leave a truncated manifest that a later
+    run would treat as a fresh cache hit.
+    """
+
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        tmp.write_text(json.dumps(data, indent=2, default=str))
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def _ensure_dirs(dirs: Iterable[Path]) -> None:
+    """Create each directory once, skipping the mkdir syscall for ones that already exist."""
+
+    for d in sorted(set(dirs)):
+        if not os.path.isdir(d):
+            os.makedirs(d, exist_ok=True)
+
+
+def _manifest_source(
+    video_path: Path | None,
+    video_url: str | None,
+    model: str,
+    timestamps_per_speaker: int,
+    *,
+    previous: Dict[str, Any] | None = None,
+) -> Dict[str, Any]:
+    """Describe the inputs of a speaker manifest, including a content-derived ``key``.
+
+    The video is identified by the SHA-256 of its bytes (streamed in 1 MiB
+    chunks). If ``previous`` recorded the same path, size, and mtime, its
+    digest is reused instead of re-reading the file.
+    """
+
+    source: Dict[str, Any] = {"model": model, "timestamps_per_speaker": timestamps_per_speaker}
+    if video_path:
+        st = video_path.stat()
+        source.update(path=str(video_path.resolve()), size=st.st_size, mtime_ns=st.st_mtime_ns)
+        prev = previous or {}
+        if all(prev.get(k) == source[k] for k in ("path", "size", "mtime_ns")) and prev.get("video_sha256"):
+            source["video_sha256"] = prev["video_sha256"]
+        else:
+            hasher = hashlib.sha256()
+            with video_path.open("rb") as fh:
+                for chunk in iter(lambda: fh.read(1 << 20), b""):
+                    hasher.update(chunk)
+            source["video_sha256"] = hasher.hexdigest()
+        identity = f"sha256:{source['video_sha256']}"
+    else:
+        source["video_url"] = video_url
+        identity = f"url:{video_url}"
+
+    key = hashlib.sha256(f"{identity}|{model}|{timestamps_per_speaker}".encode("utf-8")).hexdigest()
+    source["key"] = key
+    return source
+
+
 def extract_frames_with_gemini(
     video_path: Path | None,
     video_url: str | None,
@@ -53,44 +171,94 @@ def extract_frames_with_gemini(
     timestamps_per_speaker: int,
     dry_run: bool,
     api_key: str | None = None,
+    skip_speakers: set[str] | None = None,
 ) -> Dict[str, Any] | None:
-    """Run Gemini to get speaker timestamps, then extract frames with ffmpeg."""
+    """Run Gemini to get speaker timestamps, then extract frames with ffmpeg.
 
-    TTL_SECONDS = 24 * 60 * 60  # 1 day
+    Speakers listed in ``skip_speakers`` keep their Gemini entry in the
+    manifest but get no frames or crops extracted.
+    """
 
-    # Local manifest cache: if fresh, return without calling Gemini
-    if not dry_run and out_manifest.exists():
-        age = time.time() - out_manifest.stat().st_mtime
-        if age <= TTL_SECONDS:
-            try:
-                return json.loads(out_manifest.read_text())
-            except Exception:
-                pass  # fall through to recompute if cache unreadable
+    from speaker_identification.gemini_identify import identify_speakers
 
-    data = identify_speakers(
-        video_path=video_path,
-        video_url=video_url,
-        model=model,
-        timestamps_per_speaker=timestamps_per_speaker,
-        api_key=api_key,
-        dry_run=dry_run,
-    )
+    TTL_SECONDS = 24 * 60 * 60  # 1 day
 
     if dry_run:
-        return data
+        return identify_speakers(
+            video_path=video_path,
+            video_url=video_url,
+            model=model,
+            timestamps_per_speaker=timestamps_per_speaker,
+            api_key=api_key,
+            dry_run=True,
+        )
+
+    # Local manifest cache: if fresh and built from the same inputs, return as-is
+    previous = _read_fresh_json(out_manifest, TTL_SECONDS)
+    source = _manifest_source(
+        video_path,
+        video_url,
+        model,
+        timestamps_per_speaker,
+        previous=(previous or {}).get("_source"),
+    )
+    skip = set(skip_speakers or ())
+    if (
+        previous is not None
+        and (previous.get("_source") or {}).get("key") == source["key"]
+        # a manifest that skipped speakers we now need frames for is not reusable
+        and set(previous.get("_skipped_speakers") or ()) <= skip
+    ):
+        return previous
+
+    # Content-addressed cache of the Gemini result, shared across output paths
+    cache_entry = MANIFEST_CACHE_DIR / f"{source['key']}.json"
+    data = _read_fresh_json(cache_entry, TTL_SECONDS)
+    if data is None:
+        if video_path:
+            # Fail on a missing ffprobe before the paid Gemini call, not after it (uncached)
+            _ffprobe_bin()
+        data = identify_speakers(
+            video_path=video_path,
+            video_url=video_url,
+            model=model,
+            timestamps_per_speaker=timestamps_per_speaker,
+            api_key=api_key,
+            dry_run=False,
+        )
+        if video_path:
+            data["_video_duration_s"] = _get_duration_seconds(video_path)
+        try:
+            MANIFEST_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            _write_json_atomic(cache_entry, data)
+            meta = {k: v for k, v in source.items() if k not in ("key", "path", "size", "mtime_ns")}
+            _write_json_atomic(cache_entry.with_suffix(".meta.json"), meta)
+        except OSError:
+            pass  # caching is best-effort
+
+    data["_source"] = source
+    data["_skipped_speakers"] = sorted(skip)
 
     out_manifest.parent.mkdir(parents=True, exist_ok=True)
 
     if video_path:
-        frames_dir.mkdir(parents=True, exist_ok=True)
-        duration = _get_duration_seconds(video_path)
+        from speaker_identification.cropper import crop_frames_batch
+        from speaker_identification.frame_sampler import frame_filename, sample_frames_batch
+
+        # Reuse the duration stored with a cached Gemini result before spawning ffprobe
+        duration = data.get("_video_duration_s")
+        if duration is None:
+            duration = _get_duration_seconds(video_path)
+            data["_video_duration_s"] = duration
+        speaker_jobs: list[tuple[list[Dict[str, Any]], Path, Path]] = []
         for speaker in data.get("speakers", []):
             frames = speaker.get("frames") or []
             spk_id = speaker.get("id", "speaker")
+            if spk_id in skip:
+                continue
             spk_root = frames_dir / spk_id
             spk_frame_dir = spk_root / "frames"
             spk_crop_dir = spk_root / "crops"
-            spk_frame_dir.mkdir(parents=True, exist_ok=True)
             # Filter timestamps within duration and pad to requested count
             valid_frames: list[Dict[str, Any]] = []
             for f in frames:
@@ -117,24 +285,52 @@ def extract_frames_with_gemini(
 
             valid_frames = valid_frames[:timestamps_per_speaker]
             speaker["frames"] = valid_frames
-
-            ts_list = [f.get("timestamp_s") for f in valid_frames if isinstance(f, dict) and "timestamp_s" in f]
-            extracted = ffmpeg_sample_frames(video_path, ts_list, spk_frame_dir)
-            for f, path in zip(valid_frames, extracted):
-                f["frame_path"] = str(path)
-                bbox = f.get("bbox")
-                if bbox:
-                    try:
-                        crop_path = crop_frame(path, bbox, spk_crop_dir)
-                        f["crop_path"] = str(crop_path)
-                    except Exception:
-                        # leave crop_path absent if cropping fails
-                        pass
+            speaker_jobs.append((valid_frames, spk_frame_dir, spk_crop_dir))
+
+        # Create every frame/crop directory once up front; workers below never mkdir.
+        needed_dirs = {d for valid_frames, *dirs in speaker_jobs if valid_frames for d in dirs}
+        _ensure_dirs(needed_dirs)
+
+        # One ffmpeg process (fast seek per timestamp) covers every speaker's frames.
+        requests: list[tuple[float, Path]] = []
+        owners: list[tuple[Dict[str, Any], Path]] = []
+        for valid_frames, spk_frame_dir, spk_crop_dir in speaker_jobs:
+            for i, f in enumerate(valid_frames):
+                ts = f["timestamp_s"]
+                requests.append((ts, spk_frame_dir / frame_filename(i, ts)))
+                owners.append((f, spk_crop_dir))
+        extracted = sample_frames_batch(video_path, requests)
+
+        # Speakers that share a timestamp share one decoded frame.
+        crop_groups: Dict[str, tuple[Path, list[tuple[Dict[str, Any], Dict[str, float], Path]]]] = {}
+        for (f, spk_crop_dir), path in zip(owners, extracted):
+            if path is None:
+                continue
+            f["frame_path"] = str(path)
+            bbox = f.get("bbox")
+            if bbox:
+                key = f"{f['timestamp_s']:.3f}"
+                crop_groups.setdefault(key, (path, []))[1].append((f, bbox, spk_crop_dir))
+
+        def _crop(path: Path, members: list[tuple[Dict[str, Any], Dict[str, float], Path]]) -> None:
+            try:
+                crops = crop_frames_batch(path, [(bbox, d) for _, bbox, d in members], make_dirs=False)
+            except Exception:
+                # leave crop_path absent if the frame cannot be decoded
+                return
+            for (f, _, _), crop in zip(members, crops):
+                if crop is not None:
+                    f["crop_path"] = str(crop)
+
+        # Pillow releases the GIL while decoding/encoding, so crop frames concurrently.
+        with ThreadPoolExecutor(max_workers=os.cpu_count() or 4) as ex:
+            for future in [ex.submit(_crop, path, members) for path, members in crop_groups.values()]:
+                future.result()
     else:
         # No local video -> we cannot extract frames; leave frame_paths absent.
         data["note"] = "frame extraction skipped (no local video provided)"
 
-    out_manifest.write_text(json.dumps(data, indent=2))
+    _write_json_atomic(out_manifest, data)
     return data
 
 
@@ -154,6 +350,8 @@ def create_headshots(
 ) -> List[Path]:
     """Send reference frames to Gemini and return saved headshot paths."""
 
+    from headshot_generation import generate_headshot
+
     return generate_headshot(
         frame_paths,
         prompt=prompt,
@@ -169,6 +367,55 @@ def create_headshots(
     )
 
 
+def create_headshots_batch(
+    subjects: Mapping[str, Sequence[Path]],
+    *,
+    output_dir: Path,
+    prompt: str | None = None,
+    model: str | None = None,
+    aspect_ratio: str = "1:1",
+    image_size: str = "1K",
+    num_images: int = 1,
+    api_key: str | None = None,
+    crop_square: bool = True,
+    output_name: str | None = None,
+    use_cache: bool = True,
+    max_concurrency: int = 8,
+) -> Dict[str, List[Path]]:
+    """Generate headshots for several subjects concurrently.
+
+    Each subject's outputs go to ``output_dir / <subject_id>``. Calls are
+    network-bound, so overlapping them cuts wall time to roughly the slowest
+    single request; ``max_concurrency`` caps in-flight requests for quota.
+    Results are returned in the same order as ``subjects``.
+    """
+
+    from headshot_generation import generate_headshot
+
+    if not subjects:
+        return {}
+
+    def _one(subject_id: str) -> List[Path]:
+        return generate_headshot(
+            subjects[subject_id],
+            prompt=prompt,
+            output_dir=output_dir / subject_id,
+            model=model,
+            aspect_ratio=aspect_ratio,
+            image_size=image_size,
+            num_images=num_images,
+            api_key=api_key,
+            crop_square=crop_square,
+            output_name=output_name,
+            use_cache=use_cache,
+        )
+
+    ids = list(subjects)
+    with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(ids)))) as ex:
+        results = list(ex.map(_one, ids))
+    return dict(zip(ids, results))
+
+
 def compose_thumbnail(
     background: Path | None,
     headshots: Iterable[Path],
@@ -184,6 +431,8 @@ def compose_thumbnail(
 ) -> Path:
     """Composite headshots and text using Gemini image model."""
 
+    from thumbnail_composition import compose_thumbnail as compose_with_gemini
+
     return compose_with_gemini(
         headshot_paths=list(headshots),
         title_text=text,
@@ -198,6 +447,19 @@ def compose_thumbnail(
     )
 
 
+def _pick_refs(frames: Iterable[Mapping[str, Any]], max_n: int = 3) -> list[Path]:
+    """Return up to ``max_n`` reference images, preferring each frame's crop over the full frame."""
+
+    paths = (f.get("crop_path") or f.get("frame_path") for f in frames)
+    return [Path(p) for p in itertools.islice((p for p in paths if p), max_n)]
+
+
+def _cached_headshot_ids(headshots_dir: Path) -> set[str]:
+    """Return the speaker ids that already have ``<headshots_dir>/<id>/headshot.png``."""
+
+    return {p.parent.name for p in headshots_dir.glob("*/headshot.png")}
+
+
 def run_end_to_end(
     *,
     video_path: Path,
@@ -216,9 +478,13 @@ def run_end_to_end(
 ) -> dict[str, Any]:
     """Run sample -> headshots -> compose. Returns summary dict."""
 
+    _ensure_logging()
     summary: dict[str, Any] = {"steps": []}
 
-    print(f"[sample] starting (model={sample_model})")
+    # Speakers with a headshot on disk need no frames; dry runs still list everyone
+    cached = _cached_headshot_ids(headshots_dir) if not dry_run else set()
+
+    log.info("[sample] starting (model=%s)", sample_model)
     sample_result = extract_frames_with_gemini(
         video_path=video_path,
         video_url=None,
@@ -228,16 +494,19 @@ def run_end_to_end(
         timestamps_per_speaker=timestamps_per_speaker,
         dry_run=dry_run,
         api_key=api_key,
+        skip_speakers=cached if video_path and cached else None,
     )
-    print(f"[sample] done -> {manifest_path}")
+    log.info("[sample] done -> %s", manifest_path)
     summary["manifest"] = manifest_path
     summary["steps"].append("sample")
 
     if dry_run:
         return summary
 
-    # Generate headshots per speaker (skip if already exists)
-    headshot_paths: list[Path] = []
+    # Generate headshots per speaker (skip if already exists); misses run concurrently
+    headshot_by_speaker: dict[str, Path] = {}
+    jobs: dict[str, list[Path]] = {}
+    order: list[str] = []
     for speaker in sample_result.get("speakers", []):
         spk_id = speaker.get("id", "speaker")
         out_dir = headshots_dir / spk_id
@@ -245,37 +514,34 @@ def run_end_to_end(
         
         # Check if headshot already exists
         if existing_headshot.exists():
-            print(f"[headshots] speaker {spk_id}: using existing {existing_headshot}")
-            headshot_paths.append(existing_headshot)
+            log.info("[headshots] speaker %s: using existing %s", spk_id, existing_headshot)
+            headshot_by_speaker[spk_id] = existing_headshot
+            order.append(spk_id)
             continue
         
         frames = speaker.get("frames") or []
-        print(f"[headshots] speaker {spk_id}: {len(frames)} frame entries")
-        # prefer crops, fall back to frames; max 3
-        refs: list[Path] = []
-        for f in frames:
-            if len(refs) >= 3:
-                break
-            if f.get("crop_path"):
-                refs.append(Path(f["crop_path"]))
-            elif f.get("frame_path"):
-                refs.append(Path(f["frame_path"]))
+        log.info("[headshots] speaker %s: %s frame entries", spk_id, len(frames))
+        refs = _pick_refs(frames)
         if not refs:
             continue
-        out_dir.mkdir(parents=True, exist_ok=True)
-        print(f"[headshots] speaker {spk_id}: generating from {len(refs)} refs -> {out_dir}")
-        shots = generate_headshot(
-            refs,
-            model=headshot_model,
-            output_dir=out_dir,
-            output_name="headshot.png",
-            api_key=api_key,
-            use_cache=True,
-        )
+        log.info("[headshots] speaker %s: generating from %s refs -> %s", spk_id, len(refs), out_dir)
+        jobs[spk_id] = refs
+        order.append(spk_id)
+
+    generated = create_headshots_batch(
+        jobs,
+        output_dir=headshots_dir,
+        model=headshot_model,
+        output_name="headshot.png",
+        api_key=api_key,
+        use_cache=True,
+    )
+    for spk_id, shots in generated.items():
         if not shots:
             raise RuntimeError(f"Headshot model returned no images for speaker {spk_id}")
-        headshot_paths.append(shots[0])
-        print(f"[headshots] speaker {spk_id}: saved {shots[0]}")
+        headshot_by_speaker[spk_id] = shots[0]
+        log.info("[headshots] speaker %s: saved %s", spk_id, shots[0])
+    headshot_paths = [headshot_by_speaker[spk_id] for spk_id in order]
     summary["headshots"] = [str(p) for p in headshot_paths]
     summary["steps"].append("headshots")
 
@@ -283,7 +549,7 @@ def run_end_to_end(
         summary["warning"] = "Need at least two headshots for compose"
         return summary
 
-    print(f"[compose] using {headshot_paths[:2]} template={template}")
+    log.info("[compose] using %s template=%s", headshot_paths[:2], template)
     thumb_path = compose_thumbnail(
         background=None,
         headshots=headshot_paths[:2],
@@ -293,28 +559,46 @@ def run_end_to_end(
         aspect_ratio=aspect_ratio,
         use_cache=True,
     )
-    print(f"[compose] done -> {thumb_path}")
+    log.info("[compose] done -> %s", thumb_path)
     summary["thumbnail"] = str(thumb_path)
     summary["steps"].append("compose")
     return summary
 
 
-def run() -> None:
-    """Interactive pipeline: prompts for video path and title text."""
+def run(args: argparse.Namespace | None = None) -> None:
+    """Run sample -> headshots -> compose, prompting only for inputs missing from ``args``.
+
+    ``args`` may carry ``video``, ``title`` and ``aspect_ratio`` (see ``main``).
+    When prompting, the title is asked for up front so the rest of the run
+    needs no further input.
+    """
+
+    _ensure_logging()
+    video_input = getattr(args, "video", None)
+    title_text = getattr(args, "title", None)
+    aspect_ratio = getattr(args, "aspect_ratio", None) or "16:9"
 
     # Prompt for video file path
-    print("\n=== Podcast Thumbnail Pipeline ===\n")
-    video_input = input("Enter video file path: ").strip()
+    log.info("=== Podcast Thumbnail Pipeline ===")
+    if not video_input:
+        video_input = input("Enter video file path: ").strip()
     if not video_input:
-        print("No video path provided. Exiting.")
+        log.error("No video path provided. Exiting.")
         return
 
     video_path = Path(video_input).expanduser().resolve()
     if not video_path.exists():
-        print(f"Error: Video file not found: {video_path}")
+        log.error("Video file not found: %s", video_path)
         return
 
-    print(f"\n[info] Video: {video_path}")
+    # Prompt for title text before the long-running steps
+    if not title_text:
+        title_text = input("Enter title text for thumbnail: ").strip()
+    if not title_text:
+        log.error("No title provided. Exiting.")
+        return
+
+    log.info("[info] Video: %s", video_path)
 
     # Fixed artifact paths
     manifest_path = Path("artifacts/manifests/speakers.json")
@@ -322,7 +606,7 @@ def run() -> None:
     headshots_dir = Path("artifacts/headshots")
 
     # Step 1: Sample frames and identify speakers
-    print("\n[step 1/3] Sampling frames and identifying speakers...")
+    log.info("[step 1/3] Sampling frames and identifying speakers...")
     sample_result = extract_frames_with_gemini(
         video_path=video_path,
         video_url=None,
@@ -331,92 +615,108 @@ def run() -> None:
         frames_dir=frames_dir,
         timestamps_per_speaker=4,
         dry_run=False,
+        skip_speakers=_cached_headshot_ids(headshots_dir),
     )
-    print(f"[sample] Manifest saved to {manifest_path}")
+    log.info("[sample] Manifest saved to %s", manifest_path)
 
     # Step 2: Generate headshots per speaker
-    print("\n[step 2/3] Generating headshots...")
-    headshot_paths: list[Path] = []
+    log.info("[step 2/3] Generating headshots...")
+    headshot_by_speaker: dict[str, Path] = {}
+    jobs: dict[str, list[Path]] = {}
+    order: list[str] = []
     for speaker in sample_result.get("speakers", []):
         spk_id = speaker.get("id", "speaker")
         out_dir = headshots_dir / spk_id
         existing_headshot = out_dir / "headshot.png"
 
         if existing_headshot.exists():
-            print(f"  [headshots] {spk_id}: using cached {existing_headshot}")
-            headshot_paths.append(existing_headshot)
+            log.info("  [headshots] %s: using cached %s", spk_id, existing_headshot)
+            headshot_by_speaker[spk_id] = existing_headshot
+            order.append(spk_id)
             continue
 
-        frames = speaker.get("frames") or []
-        refs: list[Path] = []
-        for f in frames:
-            if len(refs) >= 3:
-                break
-            if f.get("crop_path"):
-                refs.append(Path(f["crop_path"]))
-            elif f.get("frame_path"):
-                refs.append(Path(f["frame_path"]))
+        refs = _pick_refs(speaker.get("frames") or [])
 
         if not refs:
-            print(f"  [headshots] {spk_id}: no reference frames, skipping")
+            log.info("  [headshots] %s: no reference frames, skipping", spk_id)
             continue
 
-        out_dir.mkdir(parents=True, exist_ok=True)
-        print(f"  [headshots] {spk_id}: generating from {len(refs)} refs...")
-        shots = generate_headshot(
-            refs,
-            output_dir=out_dir,
-            output_name="headshot.png",
-            use_cache=True,
-        )
+        log.info("  [headshots] %s: generating from %s refs...", spk_id, len(refs))
+        jobs[spk_id] = refs
+        order.append(spk_id)
+
+    generated = create_headshots_batch(
+        jobs,
+        output_dir=headshots_dir,
+        output_name="headshot.png",
+        use_cache=True,
+    )
+    for spk_id, shots in generated.items():
         if shots:
-            headshot_paths.append(shots[0])
-            print(f"  [headshots] {spk_id}: saved {shots[0]}")
+            headshot_by_speaker[spk_id] = shots[0]
+            log.info("  [headshots] %s: saved %s", spk_id, shots[0])
         else:
-            print(f"  [headshots] {spk_id}: generation failed")
+            log.error("  [headshots] %s: generation failed", spk_id)
+    headshot_paths = [headshot_by_speaker[spk_id] for spk_id in order if spk_id in headshot_by_speaker]
 
     if len(headshot_paths) < 2:
-        print("\nError: Need at least 2 headshots for composition. Exiting.")
+        log.error("Need at least 2 headshots for composition. Exiting.")
         return
 
-    print(f"\n[info] Generated {len(headshot_paths)} headshots")
-
-    # Prompt for title text
-    print("\n[step 3/3] Thumbnail composition")
-    title_text = input("Enter title text for thumbnail: ").strip()
-    if not title_text:
-        print("No title provided. Exiting.")
-        return
+    log.info("[info] Generated %s headshots", len(headshot_paths))
 
-    print(f"\n[compose] Creating thumbnails with: \"{title_text}\"")
+    log.info("[step 3/3] Thumbnail composition")
+    log.info("[compose] Creating thumbnails with: \"%s\"", title_text)
     
     # Style 1: diary_ceo (two speakers, title at top)
-    print("\n  [style 1/2] diary_ceo (two speakers, title at top)...")
+    log.info("  [style 1/2] diary_ceo (two speakers, title at top)...")
     thumb1 = compose_thumbnail(
         background=None,
         headshots=headshot_paths[:2],
         text=title_text,
         template="diary_ceo",
+        aspect_ratio=aspect_ratio,
         output_path=Path("artifacts/thumbnails/thumb_diary_ceo.png"),
         use_cache=True,
     )
-    print(f"  -> {thumb1}")
+    log.info("  -> %s", thumb1)
     
     # Style 2: single_speaker (speaker_1 only, text on right)
-    print("  [style 2/2] single_speaker (one person left, text right)...")
+    log.info("  [style 2/2] single_speaker (one person left, text right)...")
     thumb2 = compose_thumbnail(
         background=None,
         headshots=[headshot_paths[0]],  # only one headshot
         text=title_text,
         template="single_speaker",
+        aspect_ratio=aspect_ratio,
         output_path=Path("artifacts/thumbnails/thumb_single_speaker.png"),
         use_cache=True,
     )
-    print(f"  -> {thumb2}")
+    log.info("  -> %s", thumb2)
     
-    print("\n=== Done! ===")
-    print(f"Generated 2 thumbnails in artifacts/thumbnails/\n")
+    log.info("=== Done! ===")
+    log.info("Generated 2 thumbnails in artifacts/thumbnails/")
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    """Entry point for ``python -m orchestration_cli.pipeline``."""
+
+    parser = argparse.ArgumentParser(
+        prog="python -m orchestration_cli.pipeline",
+        description="Sample speakers, generate headshots, and compose thumbnails for a podcast video.",
+    )
+    parser.add_argument("--video", help="Path to the edited podcast video (prompted if omitted).")
+    parser.add_argument("--title", help="Thumbnail title text; wrap words in *asterisks* to highlight (prompted if omitted).")
+    parser.add_argument("--aspect-ratio", default="16:9", help="Thumbnail aspect ratio (default: 16:9).")
+    verbosity = parser.add_mutually_exclusive_group()
+    verbosity.add_argument("-q", "--quiet", action="store_true", help="Only report errors.")
+    verbosity.add_argument("-v", "--verbose", action="store_true", help="Include debug output.")
+    args = parser.parse_args(argv)
+
+    level = logging.ERROR if args.quiet else logging.DEBUG if args.verbose else logging.INFO
+    logging.basicConfig(level=level, format="%(message)s")
+    run(args)
 
 
 if __name__ == "__main__":
-    run()
+    main()
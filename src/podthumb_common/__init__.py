@@ -0,0 +1,5 @@
+"""Helpers shared across the podthumb packages."""
+
+from .gemini_io import import_genai, iter_image_bytes, load_env_key, reset_env_cache, write_image
+
+__all__ = ["import_genai", "iter_image_bytes", "load_env_key", "reset_env_cache", "write_image"]
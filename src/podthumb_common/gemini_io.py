@@ -0,0 +1,126 @@
+"""Gemini plumbing shared by the headshot and thumbnail packages."""
+
+from __future__ import annotations
+
+import functools
+import io
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Iterator, Tuple
+
+from PIL import Image
+
+
+_ENV_LOADED = False
+_ENV_LINE_RE = re.compile(rb"^[ \t]*([A-Za-z_]\w*)[ \t]*=[ \t]*(.*?)[ \t\r]*$", re.M)
+
+
+def load_env_key() -> None:
+    """Best-effort load GEMINI_API_KEY/GOOGLE_API_KEY from .env files.
+
+    Checks (in order): existing environment, local project .env, cwd .env,
+    the sibling "win" repo .env if present, and HOME/.env. Values already in
+    the environment are never overwritten. Runs at most once per process;
+    see ``reset_env_cache`` to force a reload.
+    """
+
+    global _ENV_LOADED
+    if _ENV_LOADED:
+        return
+
+    candidates = [
+        Path("/Users/adi/GitHub/win/.env"),
+        Path(__file__).resolve().parents[2] / ".env",  # this repo root
+        Path.cwd() / ".env",
+        Path.home() / ".env",
+    ]
+
+    for path in candidates:
+        try:
+            data = path.read_bytes()
+        except (FileNotFoundError, IsADirectoryError, PermissionError):
+            continue
+        for match in _ENV_LINE_RE.finditer(data):
+            os.environ.setdefault(match.group(1).decode(), match.group(2).decode())
+
+    _ENV_LOADED = True
+
+
+def reset_env_cache() -> None:
+    """Forget that .env files were loaded so the next call re-reads them (tests)."""
+
+    global _ENV_LOADED
+    _ENV_LOADED = False
+
+
+@functools.lru_cache(maxsize=None)
+def import_genai(purpose: str):
+    """Import google-genai on first use, so cache hits never pay for loading the SDK."""
+
+    try:
+        from google import genai
+        from google.genai import types
+    except ImportError as exc:  # pragma: no cover - handled at runtime
+        raise ImportError(
+            f"google-genai is required for {purpose}. Install with `pip install google-genai`."
+        ) from exc
+    return genai, types
+
+
+_SUFFIX_MIME = {".png": "image/png", ".jpg": "image/jpeg", ".jpeg": "image/jpeg"}
+
+
+def iter_image_bytes(response) -> Iterator[Tuple[bytes, str | None]]:
+    """Yield encoded ``(data, mime_type)`` pairs for images in a response.
+
+    Sources are tried in order (``response.parts``, ``generated_images``, then
+    raw ``candidates``); later ones are only consulted if earlier ones were
+    empty. Bytes are yielded as returned by the API, without decoding.
+    """
+
+    found = False
+    for part in getattr(response, "parts", None) or ():
+        inline = getattr(part, "inline_data", None)
+        if inline is not None and getattr(inline, "data", None):
+            found = True
+            yield inline.data, getattr(inline, "mime_type", None)
+    if found:
+        return
+
+    for img in getattr(response, "generated_images", None) or ():
+        image = getattr(img, "image", img)
+        data = getattr(image, "image_bytes", None)
+        if data:
+            found = True
+            yield data, getattr(image, "mime_type", None)
+    if found:
+        return
+
+    for candidate in getattr(response, "candidates", None) or ():
+        for part in getattr(getattr(candidate, "content", None), "parts", None) or ():
+            inline = getattr(part, "inline_data", None)
+            if inline is not None and getattr(inline, "data", None):
+                yield inline.data, getattr(inline, "mime_type", None)
+
+
+def write_image(data: bytes, mime_type: str | None, out_path: Path) -> None:
+    """Write encoded image bytes, re-encoding only if the format doesn't match the suffix.
+
+    The image goes to a sibling temp file that is renamed into place, so an
+    interrupted write never leaves a truncated file for a later cache check.
+    """
+
+    # pid + thread id keeps concurrent writers (compose_many, threads) off each other's temp file.
+    tmp = out_path.with_name(f"{out_path.name}.{os.getpid()}.{threading.get_ident()}.part")
+    try:
+        if mime_type and _SUFFIX_MIME.get(out_path.suffix.lower()) == mime_type:
+            tmp.write_bytes(data)
+        else:
+            with Image.open(io.BytesIO(data)) as image:
+                # Format comes from the real suffix; the temp name ends in .part.
+                image.save(tmp, format=Image.registered_extensions().get(out_path.suffix.lower()))
+        os.replace(tmp, out_path)
+    finally:
+        tmp.unlink(missing_ok=True)
@@ -3,10 +3,64 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Dict
+from typing import Dict, List, Sequence, Tuple
 
 from PIL import Image
 
+# Headshot references are downscaled to at most 1024px, so frames taller than
+# this can be decoded at a reduced JPEG scale without losing usable detail.
+DRAFT_MIN_HEIGHT = 1024
+
+
+def _open_frame(frame_path: Path) -> Image.Image:
+    img = Image.open(frame_path)
+    if img.format == "JPEG" and img.size[1] >= 2 * DRAFT_MIN_HEIGHT:
+        # libjpeg scales during IDCT (1/2, 1/4, ...) while staying >= the requested size
+        w_px, h_px = img.size
+        img.draft("RGB", (max(1, w_px * DRAFT_MIN_HEIGHT // h_px), DRAFT_MIN_HEIGHT))
+    img.load()
+    return img
+
+
+def _relative_span(bbox: Dict[str, float], padding: float, min_width: float) -> Tuple[float, float]:
+    """Normalized (x1, x2) of the crop; the crop always spans the full frame height."""
+
+    x1 = max(0.0, min(1.0, float(bbox.get("x1", 0))))
+    x2 = max(0.0, min(1.0, float(bbox.get("x2", 1))))
+    if x2 <= x1:
+        raise ValueError("Invalid bbox coordinates")
+
+    # Expand bbox outward horizontally; keep full vertical span
+    pad_x = padding * (x2 - x1)
+    x1 = max(0.0, x1 - pad_x)
+    x2 = min(1.0, x2 + pad_x)
+
+    # Enforce minimum box width by expanding symmetrically around center
+    cx = (x1 + x2) / 2
+    w_rel = max(x2 - x1, min_width)
+    return max(0.0, cx - w_rel / 2), min(1.0, cx + w_rel / 2)
+
+
+def _crop_one(img: Image.Image, stem: str, span: Tuple[float, float], out_dir: Path) -> Path:
+    w_px, h_px = img.size
+    icc_profile = img.info.get("icc_profile")
+
+    x1, x2 = span
+    crop = img.crop((int(x1 * w_px), 0, int(x2 * w_px), h_px))
+    if crop.size[0] <= 0 or crop.size[1] <= 0:
+        raise ValueError("Empty crop")
+    if crop.mode not in ("RGB", "RGBA"):
+        crop = crop.convert("RGB")
+
+    if crop.mode == "RGBA":
+        # keep transparency lossless
+        out_path = out_dir / f"{stem}_crop.png"
+        crop.save(out_path, format="PNG", icc_profile=icc_profile)
+    else:
+        out_path = out_dir / f"{stem}_crop.jpg"
+        crop.save(out_path, format="JPEG", quality=90, subsampling=1, optimize=True, icc_profile=icc_profile)
+    return out_path
+
 
 def crop_frame(
     frame_path: Path,
@@ -15,6 +69,8 @@ def crop_frame(
     padding: float = 0.35,
     min_width: float = 0.35,
     min_height: float = 0.5,
+    *,
+    make_dirs: bool = True,
 ) -> Path:
     """Crop a frame to the provided bbox (normalized 0-1) and save.
 
@@ -22,45 +78,54 @@ def crop_frame(
         frame_path: path to the full frame image.
         bbox: dict with keys x1,y1,x2,y2 (normalized floats 0-1).
         out_dir: directory to write the crop.
+        make_dirs: create ``out_dir`` if needed; pass False when the caller
+            has already created it.
 
     Returns:
         Path to the cropped image.
     """
 
-    out_dir.mkdir(parents=True, exist_ok=True)
-    img = Image.open(frame_path)
-    w_px, h_px = img.size
+    span = _relative_span(bbox, padding, min_width)  # reject bad boxes before decoding
+    if make_dirs:
+        out_dir.mkdir(parents=True, exist_ok=True)
+    with _open_frame(frame_path) as img:
+        return _crop_one(img, frame_path.stem, span, out_dir)
 
-    x1 = max(0.0, min(1.0, float(bbox.get("x1", 0))))
-    x2 = max(0.0, min(1.0, float(bbox.get("x2", 1))))
-    # Use full height irrespective of model y-bbox
-    y1, y2 = 0.0, 1.0
 
-    if x2 <= x1 or y2 <= y1:
-        raise ValueError("Invalid bbox coordinates")
+def crop_frames_batch(
+    frame_path: Path,
+    targets: Sequence[Tuple[Dict[str, float], Path]],
+    padding: float = 0.35,
+    min_width: float = 0.35,
+    *,
+    make_dirs: bool = True,
+) -> List[Path | None]:
+    """Crop several ``(bbox, out_dir)`` targets from one frame, decoding it once.
 
-    # Expand bbox outward horizontally; keep full vertical span
-    pad_x = padding * (x2 - x1)
-    x1 = max(0.0, x1 - pad_x)
-    x2 = min(1.0, x2 + pad_x)
+    Returns the crop path per target, or ``None`` where the bbox was invalid
+    or the crop could not be written.
+    """
 
-    # Enforce minimum box size by expanding symmetrically around center
-    cx = (x1 + x2) / 2
-    cy = (y1 + y2) / 2
-    w_rel = x2 - x1
-    h_rel = 1.0  # full height
-    w_rel = max(w_rel, min_width)
-    x1 = max(0.0, cx - w_rel / 2)
-    x2 = min(1.0, cx + w_rel / 2)
-    y1, y2 = 0.0, 1.0
-
-    box = (int(x1 * w_px), int(y1 * h_px), int(x2 * w_px), int(y2 * h_px))
-    crop = img.crop(box)
-    if crop.size[0] <= 0 or crop.size[1] <= 0:
-        raise ValueError("Empty crop")
-    if crop.mode not in ("RGB", "RGBA"):
-        crop = crop.convert("RGB")
+    # Box math is done for every target up front so a frame with no usable box is never decoded.
+    spans: List[Tuple[float, float] | None] = []
+    for bbox, _ in targets:
+        try:
+            spans.append(_relative_span(bbox, padding, min_width))
+        except (ValueError, TypeError):
+            spans.append(None)
+    results: List[Path | None] = [None] * len(targets)
+    if not any(spans):
+        return results
 
-    out_path = out_dir / f"{frame_path.stem}_crop{frame_path.suffix}"
-    crop.save(out_path, format="PNG")
-    return out_path
+    if make_dirs:
+        for d in {out_dir for (_, out_dir), span in zip(targets, spans) if span}:
+            d.mkdir(parents=True, exist_ok=True)
+    with _open_frame(frame_path) as img:
+        for idx, ((_, out_dir), span) in enumerate(zip(targets, spans)):
+            if span is None:
+                continue
+            try:
+                results[idx] = _crop_one(img, frame_path.stem, span, out_dir)
+            except (ValueError, OSError):
+                pass
+    return results
@@ -2,9 +2,128 @@
 
 from __future__ import annotations
 
+import itertools
+import math
+import os
+import shutil
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Iterable, List
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+# Inputs opened by one batched ffmpeg call; each input is a separate fast seek.
+MAX_INPUTS_PER_CALL = 32
+
+
+def frame_filename(index: int, ts: float) -> str:
+    """Filename used for the ``index``-th frame sampled at ``ts`` seconds."""
+
+    return f"frame_{index:03d}_{f'{ts:.3f}'.replace('.', 'p')}.jpg"
+
+
+def _extract_one(video_path: Path, ts: float, frame_path: Path, quality: int) -> bool:
+    """Write the frame at ``ts`` to ``frame_path``; False if ffmpeg fails."""
+
+    cmd = [
+        "ffmpeg",
+        "-ss",
+        f"{ts:.3f}",
+        "-i",
+        str(video_path),
+        "-frames:v",
+        "1",
+        "-q:v",
+        str(quality),
+        "-y",
+        str(frame_path),
+    ]
+    try:
+        subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    except subprocess.CalledProcessError:
+        # Skip timestamps outside duration or other ffmpeg errors.
+        return False
+    return True
+
+
+def _link_or_copy(src: Path, dst: Path) -> Path:
+    """Hardlink ``src`` to ``dst``, copying when linking is not possible (e.g. across filesystems)."""
+
+    dst.unlink(missing_ok=True)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+    return dst
+
+
+def _extract_batch(
+    video_path: Path,
+    requests: Sequence[Tuple[float, Path]],
+    quality: int,
+) -> List[Path | None]:
+    results: List[Path | None] = [None] * len(requests)
+    for start in range(0, len(requests), MAX_INPUTS_PER_CALL):
+        chunk = requests[start : start + MAX_INPUTS_PER_CALL]
+        cmd = ["ffmpeg", "-v", "error", "-y"]
+        for ts, _ in chunk:
+            cmd += ["-ss", f"{ts:.3f}", "-i", str(video_path)]
+        for idx, (_, out_path) in enumerate(chunk):
+            # Drop stale outputs so a missing frame can't masquerade as success.
+            out_path.unlink(missing_ok=True)
+            cmd += ["-map", f"{idx}:v:0", "-frames:v", "1", "-q:v", str(quality), str(out_path)]
+        try:
+            subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        except subprocess.CalledProcessError:
+            # One bad timestamp fails the whole call; retry those frames individually,
+            # in parallel since each ffmpeg child runs outside the GIL.
+            workers = min(len(chunk), os.cpu_count() or 4)
+            with ThreadPoolExecutor(max_workers=workers) as ex:
+                ok = list(ex.map(lambda req: _extract_one(video_path, req[0], req[1], quality), chunk))
+            for idx, (_, out_path) in enumerate(chunk):
+                if ok[idx]:
+                    results[start + idx] = out_path
+            continue
+        for idx, (_, out_path) in enumerate(chunk):
+            if out_path.exists() and out_path.stat().st_size > 0:
+                results[start + idx] = out_path
+    return results
+
+
+def sample_frames_batch(
+    video_path: Path,
+    requests: Sequence[Tuple[float, Path]],
+    quality: int = 2,
+) -> List[Path | None]:
+    """Extract many ``(timestamp, out_path)`` frames with as few ffmpeg processes as possible.
+
+    Each timestamp becomes its own ``-ss <ts> -i <video>`` input (fast,
+    keyframe-assisted seek) mapped to a single-frame output, so one process
+    serves up to ``MAX_INPUTS_PER_CALL`` frames. Requests sharing a timestamp
+    (to the millisecond) are decoded once and hardlinked to the other paths.
+    Output directories must already exist. Returns the written path per
+    request, or ``None`` where ffmpeg produced nothing (e.g. timestamp past
+    the end).
+    """
+
+    first_for_ts: Dict[str, int] = {}
+    unique: List[int] = []
+    for i, (ts, _) in enumerate(requests):
+        key = f"{ts:.3f}"
+        if key not in first_for_ts:
+            first_for_ts[key] = i
+            unique.append(i)
+
+    results: List[Path | None] = [None] * len(requests)
+    for i, path in zip(unique, _extract_batch(video_path, [requests[i] for i in unique], quality)):
+        results[i] = path
+    for i, (ts, out_path) in enumerate(requests):
+        src = results[first_for_ts[f"{ts:.3f}"]]
+        if results[i] is None and src is not None:
+            try:
+                results[i] = _link_or_copy(src, out_path)
+            except OSError:
+                pass
+    return results
 
 
 def sample_frames(
@@ -13,40 +132,25 @@ def sample_frames(
     out_dir: Path,
     quality: int = 2,
 ) -> List[Path]:
-    """Extract frames at given timestamps using ffmpeg."""
+    """Extract frames at given timestamps using ffmpeg.
+
+    Frames are pulled through ``sample_frames_batch``, so N timestamps cost
+    one ffmpeg process (per ``MAX_INPUTS_PER_CALL``) rather than N.
+    """
 
     out_dir.mkdir(parents=True, exist_ok=True)
-    written: List[Path] = []
-    for i, ts in enumerate(timestamps):
-        ts_str = f"{ts:.3f}"
-        frame_path = out_dir / f"frame_{i:03d}_{ts_str.replace('.', 'p')}.jpg"
-        cmd = [
-            "ffmpeg",
-            "-ss",
-            ts_str,
-            "-i",
-            str(video_path),
-            "-vframes",
-            "1",
-            "-q:v",
-            str(quality),
-            "-y",
-            str(frame_path),
-        ]
-        try:
-            subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-        except subprocess.CalledProcessError:
-            # Skip timestamps outside duration or other ffmpeg errors.
-            continue
-        written.append(frame_path)
-    return written
+    requests = [(ts, out_dir / frame_filename(i, ts)) for i, ts in enumerate(timestamps)]
+    return [p for p in sample_frames_batch(video_path, requests, quality) if p is not None]
 
 
 def frange(start: float, stop: float, step: float) -> Iterable[float]:
-    cur = start
-    while cur < stop:
+    # start + i*step rather than a running sum, so rounding error does not accumulate
+    n = max(0, math.ceil((stop - start) / step))
+    for i in range(n):
+        cur = start + i * step
+        if cur >= stop:
+            break
         yield cur
-        cur += step
 
 
 def uniform_timestamps(duration_s: float, stride_s: float, limit: int | None = None) -> List[float]:
@@ -54,5 +158,4 @@ def uniform_timestamps(duration_s: float, stride_s: float, limit: int | None = N
 
     if stride_s <= 0:
         raise ValueError("stride_s must be > 0")
-    ts = [t for t in frange(0, duration_s, stride_s)]
-    return ts[:limit] if limit else ts
+    return list(itertools.islice(frange(0, duration_s, stride_s), limit or None))
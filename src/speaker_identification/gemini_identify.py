@@ -2,24 +2,291 @@
 
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import json
+import mimetypes
 import os
+import time
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Iterator
 
 from google import genai
-from google.genai import types
+from google.genai import errors, types
 
 from .prompt import build_prompt
 
 
 DEFAULT_MODEL = "gemini-3-pro-preview"
 
+# Inline requests are capped at 20 MB and the video travels base64-encoded (4/3
+# larger), so anything bigger goes through the File API instead.
+INLINE_VIDEO_MAX_BYTES = 15 * 1024 * 1024
+
+# Explicit caches created for uploaded videos, keyed by video fingerprint + model,
+# so repeat runs on the same video skip the upload and re-ingest.
+CACHE_REGISTRY_PATH = Path("~/.cache/podthumb/gemini_cache.json").expanduser()
+_SAMPLE_BYTES = 1 << 20
+
+# Uploaded videos stay ACTIVE on the File API for 48h; reuse them within this process.
+FILE_API_TTL_SECONDS = 48 * 60 * 60
+_FILE_CACHE: dict[tuple, tuple[Any, float]] = {}
+
+# ACTIVE polling: small uploads are ready in well under a second, so start at
+# 100 ms and back off to 2 s between checks, giving up after two minutes.
+_POLL_INITIAL_S = 0.1
+_POLL_FACTOR = 1.7
+_POLL_MAX_S = 2.0
+_POLL_TIMEOUT_S = 120.0
+
+_NUMBER = types.Schema(type=types.Type.NUMBER)
+_STRING = types.Schema(type=types.Type.STRING)
+
+# Mirrors the JSON layout described in prompt.build_prompt.
+SPEAKERS_SCHEMA = types.Schema(
+    type=types.Type.OBJECT,
+    properties={
+        "speakers": types.Schema(
+            type=types.Type.ARRAY,
+            items=types.Schema(
+                type=types.Type.OBJECT,
+                properties={
+                    "id": _STRING,
+                    "role": types.Schema(type=types.Type.STRING, enum=["host", "guest", "unknown"]),
+                    "note": _STRING,
+                    "confidence": _NUMBER,
+                    "frames": types.Schema(
+                        type=types.Type.ARRAY,
+                        items=types.Schema(
+                            type=types.Type.OBJECT,
+                            properties={
+                                "timestamp_s": _NUMBER,
+                                "bbox": types.Schema(
+                                    type=types.Type.OBJECT,
+                                    properties={k: _NUMBER for k in ("x1", "y1", "x2", "y2")},
+                                    required=["x1", "y1", "x2", "y2"],
+                                ),
+                            },
+                            required=["timestamp_s", "bbox"],
+                        ),
+                    ),
+                },
+                required=["id", "role", "note", "confidence", "frames"],
+            ),
+        )
+    },
+    required=["speakers"],
+)
+
 
 class GeminiIdentifyError(RuntimeError):
     pass
 
 
+def _check_inputs(video_path: Path | None, video_url: str | None, api_key: str | None) -> str:
+    if not (video_path or video_url):
+        raise GeminiIdentifyError("Provide video_path or video_url")
+    if video_path and video_url:
+        raise GeminiIdentifyError("Provide only one of video_path or video_url")
+
+    api_key = api_key or os.getenv("GEMINI_API_KEY")
+    if not api_key:
+        raise GeminiIdentifyError("GEMINI_API_KEY not set")
+    return api_key
+
+
+def _dry_run_result(prompt: str, video_path: Path | None, video_url: str | None) -> Dict[str, Any]:
+    return {"dry_run_prompt": prompt, "dry_run_video_url": video_url, "dry_run_video_path": str(video_path) if video_path else None}
+
+
+def _video_mime_type(video_path: Path) -> str:
+    mime, _ = mimetypes.guess_type(video_path.name)
+    return mime if mime and mime.startswith("video/") else "video/mp4"
+
+
+def _video_cache_key(video_path: Path, size_bytes: int, model: str, api_key: str) -> str:
+    """Cheap content fingerprint: sha256 of the first and last MiB plus the size.
+
+    Caches belong to the key/project that created them, so the key carries a
+    short API-key fingerprint and never crosses accounts.
+    """
+
+    owner = hashlib.sha256(api_key.encode()).hexdigest()[:16]
+    h = hashlib.sha256()
+    with video_path.open("rb") as fh:
+        h.update(fh.read(_SAMPLE_BYTES))
+        if size_bytes > 2 * _SAMPLE_BYTES:
+            fh.seek(-_SAMPLE_BYTES, os.SEEK_END)
+            h.update(fh.read(_SAMPLE_BYTES))
+    h.update(str(size_bytes).encode())
+    return f"{owner}:{model}:{h.hexdigest()}"
+
+
+def _load_cache_registry() -> Dict[str, Any]:
+    try:
+        data = json.loads(CACHE_REGISTRY_PATH.read_text())
+    except (OSError, ValueError):
+        return {}
+    now = time.time()
+    return {k: v for k, v in data.items() if isinstance(v, dict) and v.get("expires_at", 0) > now}
+
+
+def _save_cache_registry(registry: Dict[str, Any]) -> None:
+    try:
+        CACHE_REGISTRY_PATH.parent.mkdir(parents=True, exist_ok=True)
+        tmp = CACHE_REGISTRY_PATH.with_name(f".{CACHE_REGISTRY_PATH.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(registry, indent=2))
+        os.replace(tmp, CACHE_REGISTRY_PATH)
+    except OSError:
+        pass  # the registry is best-effort
+
+
+def _lookup_cached_content(key: str) -> str | None:
+    entry = _load_cache_registry().get(key)
+    return entry.get("cache_name") if entry else None
+
+
+def _remember_cached_content(key: str, cache_name: str, ttl_seconds: int) -> None:
+    registry = _load_cache_registry()
+    # Leave a minute of slack so we never hand out a cache that expires mid-request
+    registry[key] = {"cache_name": cache_name, "expires_at": time.time() + ttl_seconds - 60}
+    _save_cache_registry(registry)
+
+
+def _forget_cached_content(key: str) -> None:
+    registry = _load_cache_registry()
+    if registry.pop(key, None) is not None:
+        _save_cache_registry(registry)
+
+
+def _is_stale_cache_error(exc: errors.ClientError) -> bool:
+    """True if a cached-content request failed because the cache is gone or not ours."""
+
+    return exc.code in (403, 404)
+
+
+@lru_cache(maxsize=8)
+def _generate_config(cached_name: str | None) -> types.GenerateContentConfig:
+    return types.GenerateContentConfig(
+        response_mime_type="application/json",
+        response_schema=SPEAKERS_SCHEMA,
+        cached_content=cached_name,
+    )
+
+
+def _file_cache_key(video_path: Path, api_key: str) -> tuple:
+    st = video_path.stat()
+    return (api_key, str(video_path.resolve()), st.st_mtime_ns, st.st_size)
+
+
+def _lookup_uploaded_file(key: tuple) -> Any | None:
+    entry = _FILE_CACHE.get(key)
+    if entry is None:
+        return None
+    status, expires_at = entry
+    if expires_at <= time.time():
+        del _FILE_CACHE[key]
+        return None
+    return status
+
+
+def _remember_uploaded_file(key: tuple, status: Any) -> None:
+    # Leave slack so a file is never reused right as the File API deletes it
+    _FILE_CACHE[key] = (status, time.time() + FILE_API_TTL_SECONDS - 600)
+
+
+def _poll_delays() -> Iterator[float]:
+    delay = _POLL_INITIAL_S
+    while True:
+        yield delay
+        delay = min(delay * _POLL_FACTOR, _POLL_MAX_S)
+
+
+def _is_active(status: Any) -> bool:
+    return getattr(status, "state", "").upper() == "ACTIVE"
+
+
+def _wait_active(client: genai.Client, name: str, timeout_s: float = _POLL_TIMEOUT_S) -> Any:
+    """Poll an uploaded file until ACTIVE with exponential backoff."""
+
+    deadline = time.monotonic() + timeout_s
+    for delay in _poll_delays():
+        status = client.files.get(name=name)
+        if _is_active(status):
+            return status
+        if time.monotonic() + delay > deadline:
+            raise GeminiIdentifyError(f"File {name} not ACTIVE after wait")
+        time.sleep(delay)
+
+
+async def _wait_active_async(client: genai.Client, name: str, timeout_s: float = _POLL_TIMEOUT_S) -> Any:
+    """Async ``_wait_active``: same backoff, bounded by ``asyncio.wait_for``."""
+
+    async def _poll() -> Any:
+        for delay in _poll_delays():
+            status = await client.aio.files.get(name=name)
+            if _is_active(status):
+                return status
+            await asyncio.sleep(delay)
+
+    try:
+        return await asyncio.wait_for(_poll(), timeout_s)
+    except asyncio.TimeoutError:
+        raise GeminiIdentifyError(f"File {name} not ACTIVE after wait") from None
+
+
+def _parse_response(resp: Any) -> Dict[str, Any]:
+    data = getattr(resp, "parsed", None)
+    if data is None:
+        try:
+            data = json.loads(resp.text or "")
+        except Exception as exc:  # noqa: BLE001
+            raise GeminiIdentifyError(f"Failed to parse JSON from model: {exc}\nRaw: {resp.text}") from exc
+
+    if not isinstance(data, dict) or "speakers" not in data:
+        raise GeminiIdentifyError(f"Unexpected response schema: {data}")
+
+    return data
+
+
+def _plan_video(
+    video_path: Path | None,
+    video_url: str | None,
+    model: str,
+    api_key: str,
+    use_explicit_cache: bool,
+) -> tuple[Any | None, str | None, str | None]:
+    """Decide locally how the video travels; returns ``(video_part, cache_key, cached_name)``.
+
+    URLs and small files yield a ready ``video_part``. For large files it is
+    ``None`` and the caller reuses ``cached_name`` or uploads via the File API.
+    """
+
+    if not video_path:
+        return {"file_data": {"file_uri": video_url}}, None, None
+
+    size_bytes = video_path.stat().st_size
+    if size_bytes <= INLINE_VIDEO_MAX_BYTES:
+        # Small file: one inline request, no File API upload or polling
+        data = video_path.read_bytes()
+        return types.Part(inline_data=types.Blob(data=data, mime_type=_video_mime_type(video_path))), None, None
+
+    cache_key = _video_cache_key(video_path, size_bytes, model, api_key) if use_explicit_cache else None
+    cached_name = _lookup_cached_content(cache_key) if cache_key else None
+    return None, cache_key, cached_name
+
+
+def _cache_config(status: Any, ttl_seconds: int) -> types.CreateCachedContentConfig:
+    return types.CreateCachedContentConfig(contents=[status], ttl=f"{ttl_seconds}s")
+
+
+def _generate_kwargs(model: str, prompt: str, video_part: Any, cached_name: str | None) -> Dict[str, Any]:
+    # A cache already holds the video; sending it again would bill it twice.
+    contents = [prompt] if cached_name else [video_part, prompt]
+    return {"model": model, "contents": contents, "config": _generate_config(cached_name)}
+
+
 def identify_speakers(
     video_path: Path | None = None,
     video_url: str | None = None,
@@ -32,86 +299,100 @@ def identify_speakers(
 ) -> Dict[str, Any]:
     """Call Gemini to detect speakers and return structured JSON."""
 
-    if not (video_path or video_url):
-        raise GeminiIdentifyError("Provide video_path or video_url")
-    if video_path and video_url:
-        raise GeminiIdentifyError("Provide only one of video_path or video_url")
-
-    api_key = api_key or os.getenv("GEMINI_API_KEY")
-    if not api_key:
-        raise GeminiIdentifyError("GEMINI_API_KEY not set")
+    api_key = _check_inputs(video_path, video_url, api_key)
 
     prompt = build_prompt(timestamps_per_speaker)
 
     if dry_run:
-        return {"dry_run_prompt": prompt, "dry_run_video_url": video_url, "dry_run_video_path": str(video_path) if video_path else None}
+        return _dry_run_result(prompt, video_path, video_url)
 
     client = genai.Client(api_key=api_key)
+    video_part, cache_key, cached_name = _plan_video(video_path, video_url, model, api_key, use_explicit_cache)
 
-    parts = []
-    cached_name = None
-
-    if video_path:
-        size_bytes = video_path.stat().st_size
-        if size_bytes <= 20 * 1024 * 1024:
-            # Small file: use inline_data to avoid File API auth limits
-            data = video_path.read_bytes()
-            parts.append(types.Part(inline_data=types.Blob(data=data, mime_type="video/mp4")))
+    if cached_name:
+        try:
+            resp = client.models.generate_content(**_generate_kwargs(model, prompt, None, cached_name))
+        except errors.ClientError as exc:
+            if not _is_stale_cache_error(exc):
+                raise
+            # Cache deleted/expired server-side; re-upload below
+            _forget_cached_content(cache_key)
+            cached_name = None
         else:
+            return _parse_response(resp)
+
+    if video_part is None:
+        file_key = _file_cache_key(video_path, api_key)
+        video_part = _lookup_uploaded_file(file_key)
+        if video_part is None:
             file_ref = client.files.upload(file=str(video_path))
-            # Poll until ACTIVE
-            for _ in range(60):
-                status = client.files.get(name=file_ref.name)
-                if getattr(status, "state", "").upper() == "ACTIVE":
-                    parts.append(status)
-                    break
-                import time
-
-                time.sleep(1)
-            else:
-                raise GeminiIdentifyError(f"File {file_ref.name} not ACTIVE after wait")
-
-            if use_explicit_cache:
-                try:
-                    cache = client.caches.create(
-                        model=model,
-                        config=types.CreateCachedContentConfig(
-                            contents=[status],
-                            ttl=f"{cache_ttl_seconds}s",
-                        ),
-                    )
-                    cached_name = cache.name
-                except Exception:
-                    cached_name = None
-    elif video_url:
-        parts.append({"file_data": {"file_uri": video_url}})
+            video_part = _wait_active(client, file_ref.name)
+            _remember_uploaded_file(file_key, video_part)
+
+        if cache_key:
+            try:
+                cache = client.caches.create(model=model, config=_cache_config(video_part, cache_ttl_seconds))
+                cached_name = cache.name
+                _remember_cached_content(cache_key, cached_name, cache_ttl_seconds)
+            except Exception:
+                cached_name = None
+
+    resp = client.models.generate_content(**_generate_kwargs(model, prompt, video_part, cached_name))
+    return _parse_response(resp)
+
+
+async def aidentify_speakers(
+    video_path: Path | None = None,
+    video_url: str | None = None,
+    model: str = DEFAULT_MODEL,
+    timestamps_per_speaker: int = 4,
+    api_key: str | None = None,
+    dry_run: bool = False,
+    use_explicit_cache: bool = True,
+    cache_ttl_seconds: int = 86400,
+) -> Dict[str, Any]:
+    """Async ``identify_speakers``; several videos can be identified concurrently via ``asyncio.gather``."""
+
+    api_key = _check_inputs(video_path, video_url, api_key)
 
-    parts.append(prompt)
+    prompt = build_prompt(timestamps_per_speaker)
+
+    if dry_run:
+        return _dry_run_result(prompt, video_path, video_url)
 
-    generate_kwargs: Dict[str, Any] = {
-        "model": model,
-        "contents": parts,
-    }
+    client = genai.Client(api_key=api_key)
+    # File reads and fingerprinting stay off the event loop
+    video_part, cache_key, cached_name = await asyncio.to_thread(
+        _plan_video, video_path, video_url, model, api_key, use_explicit_cache
+    )
 
     if cached_name:
-        generate_kwargs["config"] = types.GenerateContentConfig(cached_content=cached_name)
-
-    resp = client.models.generate_content(**generate_kwargs)
-
-    text = resp.text or ""
-    text = text.strip()
-    if text.startswith("```"):
-        # strip markdown fences
-        text = text.strip("`")
-        # remove leading language label if present (e.g., json\n)
-        if text.lower().startswith("json\n"):
-            text = text[5:]
-    try:
-        data = json.loads(text)
-    except Exception as exc:  # noqa: BLE001
-        raise GeminiIdentifyError(f"Failed to parse JSON from model: {exc}\nRaw: {resp.text}") from exc
+        try:
+            resp = await client.aio.models.generate_content(**_generate_kwargs(model, prompt, None, cached_name))
+        except errors.ClientError as exc:
+            if not _is_stale_cache_error(exc):
+                raise
+            # Cache deleted/expired server-side; re-upload below
+            _forget_cached_content(cache_key)
+            cached_name = None
+        else:
+            return _parse_response(resp)
 
-    if not isinstance(data, dict) or "speakers" not in data:
-        raise GeminiIdentifyError(f"Unexpected response schema: {data}")
+    if video_part is None:
+        file_key = _file_cache_key(video_path, api_key)
+        video_part = _lookup_uploaded_file(file_key)
+        if video_part is None:
+            file_ref = await client.aio.files.upload(file=str(video_path))
+            video_part = await _wait_active_async(client, file_ref.name)
+            _remember_uploaded_file(file_key, video_part)
 
-    return data
+        if cache_key:
+            try:
+                cache = await client.aio.caches.create(model=model, config=_cache_config(video_part, cache_ttl_seconds))
+                cached_name = cache.name
+                _remember_cached_content(cache_key, cached_name, cache_ttl_seconds)
+            except Exception:
+                cached_name = None
+
+    resp = await client.aio.models.generate_content(**_generate_kwargs(model, prompt, video_part, cached_name))
+    return _parse_response(resp)
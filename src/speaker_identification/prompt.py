@@ -2,7 +2,10 @@
 
 from __future__ import annotations
 
+from functools import lru_cache
 
+
+@lru_cache(maxsize=16)
 def build_prompt(timestamps_per_speaker: int) -> str:
     return f"""
 You are selecting frames for clean headshots to build a podcast thumbnail.
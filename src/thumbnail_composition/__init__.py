@@ -1,5 +1,12 @@
 """Package for thumbnail composition components."""
 
-from .gemini_composer import compose_thumbnail, DEFAULT_MODEL, DEFAULT_PROMPT, TEMPLATES
+from .gemini_composer import (
+    DEFAULT_MODEL,
+    DEFAULT_PROMPT,
+    TEMPLATES,
+    acompose_thumbnail,
+    compose_many,
+    compose_thumbnail,
+)
 
-__all__ = ["compose_thumbnail", "DEFAULT_MODEL", "DEFAULT_PROMPT", "TEMPLATES"]
+__all__ = ["compose_thumbnail", "acompose_thumbnail", "compose_many", "DEFAULT_MODEL", "DEFAULT_PROMPT", "TEMPLATES"]
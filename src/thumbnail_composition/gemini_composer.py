@@ -2,23 +2,33 @@
 
 from __future__ import annotations
 
+import asyncio
+import functools
 import hashlib
-import io
+import mmap
 import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Iterable, List, Sequence
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Mapping, Sequence, Tuple
 
 from PIL import Image, ImageEnhance
 
-try:
-    from google import genai
+from podthumb_common import import_genai, iter_image_bytes, load_env_key, write_image
+
+if TYPE_CHECKING:  # imported lazily at runtime so cache hits never load the SDK
     from google.genai import types
-except ImportError as exc:  # pragma: no cover - handled at runtime
-    raise ImportError(
-        "google-genai is required for thumbnail composition. Install with `pip install google-genai`."
-    ) from exc
 
-from headshot_generation.gemini_client import _load_env_key
+
+try:
+    from blake3 import blake3 as _blake3
+
+    # AUTO lets blake3 split large inputs across its own thread pool.
+    _hasher = functools.partial(_blake3, max_threads=_blake3.AUTO)
+    _HASH_PREFIX = b"blake3:"
+except ImportError:  # pragma: no cover - optional speedup
+    _hasher = hashlib.sha256
+    _HASH_PREFIX = b"sha256:"
 
 
 DEFAULT_MODEL = os.environ.get("PODTHUMB_COMPOSE_MODEL", "gemini-3-pro-image-preview")
@@ -44,6 +54,13 @@ TEMPLATES = {
     ),
 }
 
+# Per-file content digests keyed by (resolved path, mtime, size); see _file_digests_cached.
+# Lives with the other podthumb caches so composing never litters the caller's cwd.
+HASH_CACHE_PATH = Path("~/.cache/podthumb/hash_cache.sqlite").expanduser()
+
+# Gemini tiles images at a fixed resolution; larger references only add upload bytes.
+MAX_REFERENCE_SIDE = 1024
+
 DEFAULT_PROMPT = (
     "You are designing a YouTube thumbnail. Keep the provided people looking like their references."
     " Place them side by side, shoulders-up, facing camera, slight inward tilt, warm approachable expression,"
@@ -54,6 +71,67 @@ DEFAULT_PROMPT = (
 )
 
 
+_MMAP_MIN_BYTES = 64 * 1024
+_FILE_DIGEST = getattr(hashlib, "file_digest", None)  # Python 3.11+
+_MADV_SEQUENTIAL = getattr(mmap, "MADV_SEQUENTIAL", None)  # POSIX only
+
+
+def _hash_file(hasher, path: Path, *, chunk_size: int = 1 << 20) -> None:
+    """Feed a file into ``hasher`` without building one big bytes object.
+
+    Files of at least 64 KiB are memory-mapped and hashed straight from the
+    page cache (blake3 does its own multi-threaded ``update_mmap``); small
+    files (and Windows, where mapping costs dominate) use fixed-size chunked
+    reads.
+    """
+
+    with path.open("rb", buffering=0) as fh:
+        size = os.fstat(fh.fileno()).st_size
+        if size >= _MMAP_MIN_BYTES and hasattr(hasher, "update_mmap"):
+            # blake3 maps the file itself and hashes the tree in parallel
+            hasher.update_mmap(str(path))
+            return
+        if os.name != "nt" and size >= _MMAP_MIN_BYTES:
+            with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if _MADV_SEQUENTIAL is not None:
+                    mm.madvise(_MADV_SEQUENTIAL)  # one front-to-back pass: ask for aggressive readahead
+                hasher.update(mm)
+            return
+        if _FILE_DIGEST is not None:
+            # 3.11+: C-level readinto loop into a reused buffer, feeding our hasher
+            _FILE_DIGEST(fh, lambda: hasher)
+            return
+        # Older Pythons: readinto one buffer instead of allocating a bytes object per chunk
+        buf = bytearray(min(chunk_size, max(size, 1)))
+        view = memoryview(buf)
+        while n := fh.readinto(buf):
+            hasher.update(view[:n])
+
+
+def _file_digest(path: Path) -> bytes | None:
+    """Return the content digest of ``path`` (``None`` if it is missing)."""
+
+    hasher = _hasher()
+    try:
+        _hash_file(hasher, path)
+    except FileNotFoundError:
+        return None
+    return hasher.digest()
+
+
+@functools.lru_cache(maxsize=32)
+def _prefix_digest(model: str, aspect_ratio: str, template: str, prompt_signature: str) -> bytes:
+    """Digest of the per-configuration cache-key inputs, computed once per distinct config."""
+
+    # blake3 when installed (sha256 otherwise); the prefix keeps the two key spaces apart
+    hasher = _hasher()
+    hasher.update(_HASH_PREFIX)
+    for part in (model, aspect_ratio, template, prompt_signature):
+        hasher.update(part.encode("utf-8"))
+        hasher.update(b"\0")
+    return hasher.digest()
+
+
 def _cache_key(
     *,
     model: str,
@@ -64,45 +142,243 @@ def _cache_key(
     template: str,
     style_reference: Path | None,
     prompt_signature: str,
-) -> str:
-    hasher = hashlib.sha256()
-    for part in (model, title_text, aspect_ratio, template, prompt_signature):
-        hasher.update(part.encode("utf-8"))
+) -> Tuple[str, Dict[Path, bytes | None]]:
+    """Return the hex cache key and the per-file digests it was built from."""
 
-    for path in headshots:
-        p = Path(path)
-        hasher.update(p.name.encode("utf-8"))
-        try:
-            hasher.update(p.read_bytes())
-        except FileNotFoundError:
-            continue
+    hasher = _hasher()
+    hasher.update(_prefix_digest(model, aspect_ratio, template, prompt_signature))
+    hasher.update(title_text.encode("utf-8"))
 
-    if background:
-        p = Path(background)
+    extras = [p for p in (background, style_reference) if p]
+    paths = [Path(p) for p in [*headshots, *extras]]
+    digests = _file_digests_cached(paths)
+    for p, digest in zip(paths, digests):
         hasher.update(p.name.encode("utf-8"))
-        try:
-            hasher.update(p.read_bytes())
-        except FileNotFoundError:
-            pass
+        if digest is not None:
+            hasher.update(digest)
 
-    if style_reference:
-        p = Path(style_reference)
-        hasher.update(p.name.encode("utf-8"))
+    return hasher.hexdigest(), dict(zip(paths, digests))
+
+
+def _file_digests_cached(paths: Sequence[Path]) -> List[bytes | None]:
+    """Content digest per path (``None`` if missing), reusing digests recorded in
+    ``HASH_CACHE_PATH`` for an unchanged (path, mtime, size) so warm lookups only stat."""
+
+    algo = _HASH_PREFIX.decode("ascii").rstrip(":")
+    keys: List[tuple | None] = []
+    for p in paths:
         try:
-            hasher.update(p.read_bytes())
+            st = p.stat()
         except FileNotFoundError:
-            pass
-
-    return hasher.hexdigest()
+            keys.append(None)
+            continue
+        keys.append((str(p.resolve()), st.st_mtime_ns, st.st_size))
+
+    try:
+        HASH_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(HASH_CACHE_PATH, timeout=5)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS digests ("
+            " path TEXT NOT NULL, algo TEXT NOT NULL, mtime_ns INTEGER NOT NULL, size INTEGER NOT NULL,"
+            " digest BLOB NOT NULL, PRIMARY KEY (path, algo))"
+        )
+    except (OSError, sqlite3.Error):
+        conn = None  # the digest cache is best-effort; fall back to hashing
+
+    try:
+        digests: List[bytes | None] = [None] * len(paths)
+        missing: List[int] = []
+        for idx, key in enumerate(keys):
+            if key is None:
+                continue
+            row = None
+            if conn is not None:
+                row = conn.execute(
+                    "SELECT digest FROM digests WHERE path = ? AND algo = ? AND mtime_ns = ? AND size = ?",
+                    (key[0], algo, key[1], key[2]),
+                ).fetchone()
+            if row is not None:
+                digests[idx] = bytes(row[0])
+            else:
+                missing.append(idx)
+
+        # Hash the misses concurrently; hashlib/blake3 release the GIL on large buffers.
+        rows: List[tuple] = []
+        if missing:
+            with ThreadPoolExecutor(max_workers=min(len(missing), os.cpu_count() or 4)) as ex:
+                fresh = list(ex.map(_file_digest, [paths[idx] for idx in missing]))
+            for idx, digest in zip(missing, fresh):
+                digests[idx] = digest
+                if digest is not None:
+                    path, mtime_ns, size = keys[idx]
+                    rows.append((path, algo, mtime_ns, size, digest))
+
+        if conn is not None and rows:
+            try:
+                with conn:
+                    conn.executemany("INSERT OR REPLACE INTO digests VALUES (?, ?, ?, ?, ?)", rows)
+            except sqlite3.Error:
+                pass
+        return digests
+    finally:
+        if conn is not None:
+            conn.close()
 
 
 def _load_image(path: Path) -> Image.Image:
     img = Image.open(path)
+    if img.format == "JPEG":
+        # Let libjpeg decode at a reduced scale while staying >= the reference cap.
+        img.draft("RGB", (MAX_REFERENCE_SIDE, MAX_REFERENCE_SIDE))
+    img.load()  # decode now so the file handle is released
     if img.mode not in ("RGB", "RGBA"):
         img = img.convert("RGB")
+    if max(img.size) > MAX_REFERENCE_SIDE:
+        img.thumbnail((MAX_REFERENCE_SIDE, MAX_REFERENCE_SIDE), Image.Resampling.LANCZOS, reducing_gap=2.0)
     return img
 
 
+_PASSTHROUGH_MIME = {"JPEG": "image/jpeg", "PNG": "image/png"}
+
+
+def _load_reference(path: Path) -> Image.Image | types.Part:
+    """Reference for the request: the file's own bytes when already model-ready, else a decoded image.
+
+    ``Image.open`` only parses the header, so a small RGB/RGBA JPEG or PNG is
+    sent as-is without any decode; anything else goes through ``_load_image``.
+    """
+
+    _, types = import_genai("thumbnail composition")
+    with Image.open(path) as probe:
+        mime = _PASSTHROUGH_MIME.get(probe.format or "")
+        ready = mime is not None and probe.mode in ("RGB", "RGBA") and max(probe.size) <= MAX_REFERENCE_SIDE
+    if ready:
+        return types.Part.from_bytes(data=path.read_bytes(), mime_type=mime)
+    return _load_image(path)
+
+
+@functools.lru_cache(maxsize=1)
+def _safety_settings() -> tuple:
+    _, types = import_genai("thumbnail composition")
+    return tuple(
+        types.SafetySetting(category=category, threshold=types.HarmBlockThreshold.BLOCK_NONE)
+        for category in (
+            types.HarmCategory.HARM_CATEGORY_HATE_SPEECH,
+            types.HarmCategory.HARM_CATEGORY_HARASSMENT,
+            types.HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT,
+            types.HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT,
+        )
+    )
+
+
+@functools.lru_cache(maxsize=8)
+def _make_config(aspect_ratio: str) -> types.GenerateContentConfig:
+    """Build (once per aspect ratio) the compose config; treat as read-only."""
+
+    _, types = import_genai("thumbnail composition")
+    return types.GenerateContentConfig(
+        response_modalities=["IMAGE"],
+        image_config=types.ImageConfig(aspect_ratio=aspect_ratio),
+        safety_settings=list(_safety_settings()),
+    )
+
+
+def _plan_output(
+    shots: Sequence[Path],
+    *,
+    title_text: str,
+    background_path: Path | None,
+    output_path: Path | str | None,
+    model: str | None,
+    aspect_ratio: str,
+    template: str,
+    style_prompt: str,
+    style_reference: Path | None,
+) -> Tuple[Path, Dict[Path, bytes | None]]:
+    """Content-addressed output path for these inputs, plus the reference file digests."""
+
+    out_path = Path(output_path) if output_path else Path("artifacts/thumbnails/thumb.png")
+
+    prompt_signature = f"{DEFAULT_PROMPT}|{style_prompt}"
+
+    cache_hash, digests = _cache_key(
+        model=model or DEFAULT_MODEL,
+        title_text=title_text,
+        aspect_ratio=aspect_ratio,
+        headshots=shots,
+        background=background_path,
+        template=template,
+        style_reference=style_reference,
+        prompt_signature=prompt_signature,
+    )
+
+    final_path = out_path.with_name(f"{out_path.stem}_{cache_hash[:10]}{out_path.suffix or '.png'}")
+    return final_path, digests
+
+
+def _prepare_request(
+    shots: Sequence[Path],
+    *,
+    title_text: str,
+    background_path: Path | None,
+    style_prompt: str,
+    style_reference: Path | None,
+    jitter: bool,
+    final_path: Path,
+    digests: Mapping[Path, bytes | None],
+) -> Tuple[str, list]:
+    """Cache-miss setup: return ``(api_key, contents)`` and create the output dir."""
+
+    load_env_key()
+    api_key = os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY")
+    if not api_key:
+        raise RuntimeError("Set GEMINI_API_KEY (or GOOGLE_API_KEY) before composing thumbnails.")
+    final_path.parent.mkdir(parents=True, exist_ok=True)
+
+    def _jitter(img: Image.Image) -> Image.Image:
+        # Tiny brightness bump to break dedup; visually negligible.
+        return ImageEnhance.Brightness(img).enhance(1.01)
+
+    # Headshots (max 4), then background and style reference; loaded in parallel.
+    # Jitter needs pixels, so the first headshot is always decoded in that case.
+    image_paths = [Path(p) for p in [*shots[:4], background_path, style_reference] if p]
+    # Drop byte-identical repeats (e.g. a headshot reused as style reference); first one wins.
+    # Digests come from _cache_key, so no file is stat'ed or hashed again here.
+    seen: set[bytes] = set()
+    unique_paths: List[Path] = []
+    for p in image_paths:
+        digest = digests.get(p)
+        if digest is not None:
+            if digest in seen:
+                continue
+            seen.add(digest)
+        unique_paths.append(p)
+    image_paths = unique_paths
+    loaders = [_load_image if jitter and idx == 0 else _load_reference for idx in range(len(image_paths))]
+    with ThreadPoolExecutor(max_workers=min(8, len(image_paths))) as ex:
+        images: List[Image.Image | types.Part] = list(ex.map(lambda fn, p: fn(p), loaders, image_paths))
+    if jitter:
+        images[0] = _jitter(images[0])
+
+    prompt = (
+        f"{DEFAULT_PROMPT} {style_prompt} Title text to render: \"{title_text}\"."
+        " Place the title at the top, compact, filling the upper third; keep tight line spacing and avoid excessive empty space."
+        " Ensure both people remain clear and unoccluded."
+    )
+    return api_key, [prompt, *images]
+
+
+def _save_response(response, final_path: Path) -> Path:
+    # First inline image as encoded bytes (SDK as_image() is unreliable); the generator stops there.
+    result = next(iter_image_bytes(response), None)
+    if result is None:
+        raise RuntimeError("Thumbnail model returned no image content.")
+
+    # Bytes go to disk as returned; PIL only re-encodes if the suffix asks for another format.
+    write_image(*result, final_path)
+    return final_path
+
+
 def compose_thumbnail(
     headshot_paths: Sequence[Path] | Iterable[Path],
     *,
@@ -131,99 +407,122 @@ def compose_thumbnail(
     shots = list(headshot_paths)
     if len(shots) < 1:
         raise ValueError("Provide at least one headshot for composition.")
-
-    _load_env_key()
-    api_key = os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY")
-    if not api_key:
-        raise RuntimeError("Set GEMINI_API_KEY (or GOOGLE_API_KEY) before composing thumbnails.")
-
-    out_path = Path(output_path) if output_path else Path("artifacts/thumbnails/thumb.png")
-    out_path.parent.mkdir(parents=True, exist_ok=True)
-
+    # Looked up once; feeds both the cache key and the prompt text.
     style_prompt = TEMPLATES.get(template, "")
-    prompt_signature = f"{DEFAULT_PROMPT}|{style_prompt}"
 
-    cache_hash = _cache_key(
-        model=model or DEFAULT_MODEL,
+    final_path, digests = _plan_output(
+        shots,
         title_text=title_text,
+        background_path=background_path,
+        output_path=output_path,
+        model=model,
         aspect_ratio=aspect_ratio,
-        headshots=shots,
-        background=background_path,
         template=template,
+        style_prompt=style_prompt,
         style_reference=style_reference,
-        prompt_signature=prompt_signature,
     )
-
-    final_path = out_path.with_name(f"{out_path.stem}_{cache_hash[:10]}{out_path.suffix or '.png'}")
     if use_cache and final_path.exists():
         return final_path
 
-    def _jitter(img: Image.Image) -> Image.Image:
-        # Tiny brightness bump to break dedup; visually negligible.
-        return ImageEnhance.Brightness(img).enhance(1.01)
-
-    images: List[Image.Image] = []
-    for idx, p in enumerate(shots[:4]):
-        img = _load_image(Path(p))
-        if jitter and idx == 0:
-            img = _jitter(img)
-        images.append(img)
-    if background_path:
-        images.append(_load_image(Path(background_path)))
-    if style_reference:
-        images.append(_load_image(Path(style_reference)))
+    # Cache miss: only now load the SDK, read credentials, create the output dir, and decode images.
+    genai, _ = import_genai("thumbnail composition")
+    api_key, contents = _prepare_request(
+        shots,
+        title_text=title_text,
+        background_path=background_path,
+        style_prompt=style_prompt,
+        style_reference=style_reference,
+        jitter=jitter,
+        final_path=final_path,
+        digests=digests,
+    )
 
     client = genai.Client(api_key=api_key)
-    safety = [
-        types.SafetySetting(category=types.HarmCategory.HARM_CATEGORY_HATE_SPEECH, threshold=types.HarmBlockThreshold.BLOCK_NONE),
-        types.SafetySetting(category=types.HarmCategory.HARM_CATEGORY_HARASSMENT, threshold=types.HarmBlockThreshold.BLOCK_NONE),
-        types.SafetySetting(category=types.HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT, threshold=types.HarmBlockThreshold.BLOCK_NONE),
-        types.SafetySetting(category=types.HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT, threshold=types.HarmBlockThreshold.BLOCK_NONE),
-    ]
-
-    config = types.GenerateContentConfig(
-        response_modalities=["IMAGE"],
-        image_config=types.ImageConfig(aspect_ratio=aspect_ratio),
-        safety_settings=safety,
+    response = client.models.generate_content(
+        model=model or DEFAULT_MODEL,
+        contents=contents,
+        config=_make_config(aspect_ratio),
     )
+    return _save_response(response, final_path)
+
+
+async def acompose_thumbnail(
+    headshot_paths: Sequence[Path] | Iterable[Path],
+    *,
+    title_text: str,
+    background_path: Path | None = None,
+    output_path: Path | str | None = None,
+    model: str | None = None,
+    aspect_ratio: str = "16:9",
+    use_cache: bool = True,
+    template: str = "diary_ceo",
+    style_reference: Path | None = None,
+    jitter: bool = False,
+) -> Path:
+    """Async variant of :func:`compose_thumbnail` using the ``client.aio`` API.
+
+    Hashing, image loading and the final write run in worker threads, so many
+    thumbnails can be awaited together (see :func:`compose_many`). Arguments
+    match :func:`compose_thumbnail`.
+    """
 
+    shots = list(headshot_paths)
+    if len(shots) < 1:
+        raise ValueError("Provide at least one headshot for composition.")
+    # Looked up once; feeds both the cache key and the prompt text.
     style_prompt = TEMPLATES.get(template, "")
 
-    prompt = (
-        f"{DEFAULT_PROMPT} {style_prompt} Title text to render: \"{title_text}\"."
-        " Place the title at the top, compact, filling the upper third; keep tight line spacing and avoid excessive empty space."
-        " Ensure both people remain clear and unoccluded."
+    final_path, digests = await asyncio.to_thread(
+        _plan_output,
+        shots,
+        title_text=title_text,
+        background_path=background_path,
+        output_path=output_path,
+        model=model,
+        aspect_ratio=aspect_ratio,
+        template=template,
+        style_prompt=style_prompt,
+        style_reference=style_reference,
     )
+    if use_cache and final_path.exists():
+        return final_path
 
-    response = client.models.generate_content(
+    genai, _ = import_genai("thumbnail composition")
+    api_key, contents = await asyncio.to_thread(
+        _prepare_request,
+        shots,
+        title_text=title_text,
+        background_path=background_path,
+        style_prompt=style_prompt,
+        style_reference=style_reference,
+        jitter=jitter,
+        final_path=final_path,
+        digests=digests,
+    )
+
+    client = genai.Client(api_key=api_key)
+    response = await client.aio.models.generate_content(
         model=model or DEFAULT_MODEL,
-        contents=[prompt, *images],
-        config=config,
+        contents=contents,
+        config=_make_config(aspect_ratio),
     )
+    return await asyncio.to_thread(_save_response, response, final_path)
 
-    # Extract first image candidate using BytesIO fallback (SDK as_image() is unreliable)
-    result_image: Image.Image | None = None
-    for cand in getattr(response, "candidates", []):
-        for part in getattr(cand.content, "parts", []) or []:
-            inline = getattr(part, "inline_data", None)
-            if inline and hasattr(inline, "data"):
-                result_image = Image.open(io.BytesIO(inline.data))
-                break
-        if result_image:
-            break
-
-    if result_image is None and hasattr(response, "parts"):
-        for part in response.parts:
-            inline = getattr(part, "inline_data", None)
-            if inline and hasattr(inline, "data"):
-                result_image = Image.open(io.BytesIO(inline.data))
-                break
-
-    if result_image is None:
-        raise RuntimeError("Thumbnail model returned no image content.")
 
-    result_image.save(final_path)
-    return final_path
+async def compose_many(specs: Iterable[Mapping[str, Any]], *, concurrency: int = 8) -> List[Path]:
+    """Compose several thumbnails concurrently, at most ``concurrency`` requests in flight.
+
+    Each spec holds :func:`compose_thumbnail` keyword arguments (including
+    ``headshot_paths``). Results are returned in spec order.
+    """
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _one(spec: Mapping[str, Any]) -> Path:
+        async with semaphore:
+            return await acompose_thumbnail(**spec)
+
+    return list(await asyncio.gather(*(_one(spec) for spec in specs)))
 
 
-__all__ = ["compose_thumbnail", "DEFAULT_MODEL", "DEFAULT_PROMPT"]
+__all__ = ["compose_thumbnail", "acompose_thumbnail", "compose_many", "DEFAULT_MODEL", "DEFAULT_PROMPT"]